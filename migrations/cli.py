@@ -0,0 +1,219 @@
+import argparse
+import json
+import time
+
+# 프로세스 시작 기준 시각 - cold start 측정용
+PROCESS_START = time.perf_counter()
+
+
+def parse_tags(values):
+    """--tag key=value 목록을 태그 딕셔너리로 변환"""
+    tags = {}
+    for value in values or []:
+        key, separator, tag_value = value.partition('=')
+        if not separator or not key:
+            raise argparse.ArgumentTypeError(f"Invalid tag (expected key=value): {value}")
+        tags[key] = tag_value
+    return tags
+
+
+def build_handlers(args):
+    """CLI 인자로 버킷별 MigrationHandler 생성"""
+    from ncpos_2_aws_s3 import MigrationHandler, NCP_BUCKETS
+
+    buckets = args.bucket or NCP_BUCKETS
+    # 타임아웃 옵션이 있는 하위 명령만 지정 (나머지는 핸들러 기본값)
+    timeouts = {
+        name: getattr(args, name)
+        for name in ('connect_timeout', 'read_timeout')
+        if getattr(args, name, None)
+    }
+    for bucket in buckets:
+        yield MigrationHandler(
+            source_bucket=bucket,
+            dest_bucket=args.dest_bucket or bucket,
+            storage_class=args.storage_class,
+            tagging=parse_tags(args.tag),
+            max_workers=getattr(args, 'transfer_workers', 1),
+            part_size=getattr(args, 'part_size', None),
+            **timeouts
+        )
+
+
+def cmd_structure(args):
+    for handler in build_handlers(args):
+        handler.print_bucket_structure(args.prefix)
+
+
+def cmd_analyze(args):
+    for handler in build_handlers(args):
+        handler.analyze_migration_needs(args.prefix)
+
+
+def cmd_dry_run(args):
+    from dry_run_estimator import MigrationEstimator
+
+    for handler in build_handlers(args):
+        estimator = MigrationEstimator(
+            handler,
+            samples_per_bucket=args.samples,
+            max_bandwidth=args.max_bandwidth
+        )
+        report = estimator.run(args.prefix)
+        print(f"Dry-run report saved to: {estimator.save_report(report)}")
+
+
+def cmd_migrate(args):
+    objects = None
+    if args.retry_from:
+        from verification import load_retry_list
+        source_bucket, dest_bucket, objects = load_retry_list(args.retry_from)
+        if args.bucket and args.bucket != [source_bucket]:
+            raise SystemExit(f"--retry-from report is for bucket {source_bucket}, not {', '.join(args.bucket)}")
+        # 재시도 목록은 리포트의 버킷 쌍에만 적용
+        args.bucket = [source_bucket]
+        args.dest_bucket = dest_bucket
+
+    for handler in build_handlers(args):
+        handler.run_migration(args.prefix, objects=objects, overwrite=objects is not None)
+        print(f"Completed migration for bucket: {handler.source_bucket}\n")
+
+
+def cmd_pack(args):
+    from packing import ObjectPacker
+
+    for handler in build_handlers(args):
+        packer = ObjectPacker(
+            handler,
+            threshold=args.threshold,
+            bundle_size=args.bundle_size,
+            pack_format=args.format,
+            group_depth=args.group_depth,
+            bundle_workers=args.bundle_workers
+        )
+        packer.run(args.prefix)
+
+
+def cmd_verify(args):
+    from verification import MigrationVerifier
+
+    for handler in build_handlers(args):
+        verifier = MigrationVerifier(
+            handler,
+            level=args.level,
+            sample_rate=args.sample_rate,
+            max_workers=args.workers
+        )
+        report = verifier.run(args.prefix)
+        print(f"Verification report saved to: {verifier.save_report(report)}")
+
+
+def cmd_replay(args):
+    from replay import DeadLetterReplayer
+
+    for handler in build_handlers(args):
+        replayer = DeadLetterReplayer(
+            handler,
+            max_workers=args.workers,
+            retry_count=args.retries,
+            backoff=args.backoff,
+            quarantine_after=args.quarantine_after,
+            connect_timeout=args.connect_timeout,
+            read_timeout=args.read_timeout
+        )
+        replayer.run()
+
+
+def cmd_coldstart(args):
+    from client_factory import measure_cold_start
+
+    timings = measure_cold_start()
+    timings['since_process_start'] = time.perf_counter() - PROCESS_START
+    print(json.dumps({name: round(seconds, 4) for name, seconds in timings.items()}, indent=2))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="NCP Object Storage -> AWS S3 migration")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_bucket_args(subparser):
+        subparser.add_argument('--bucket', action='append',
+                               help="NCP source bucket (repeatable, default: NCP_BUCKETS)")
+        subparser.add_argument('--dest-bucket', help="AWS destination bucket (default: same name)")
+        subparser.add_argument('--prefix', default="", help="Object key prefix")
+        subparser.add_argument('--storage-class', help="Destination storage class")
+        subparser.add_argument('--tag', action='append', metavar='KEY=VALUE',
+                               help="Destination object tag (repeatable, default: AWS_OBJECT_TAGGING)")
+
+    def add_timeout_args(subparser):
+        subparser.add_argument('--connect-timeout', type=float, default=10, help="Connect timeout per request (seconds)")
+        subparser.add_argument('--read-timeout', type=float, default=60, help="Read timeout per request (seconds)")
+
+    structure = subparsers.add_parser('structure', help="Print source bucket structure")
+    add_bucket_args(structure)
+    structure.set_defaults(func=cmd_structure)
+
+    analyze = subparsers.add_parser('analyze', help="Compare source and destination")
+    add_bucket_args(analyze)
+    analyze.set_defaults(func=cmd_analyze)
+
+    dry_run = subparsers.add_parser('dry-run', help="Estimate duration, requests and cost")
+    add_bucket_args(dry_run)
+    dry_run.add_argument('--samples', type=int, default=200, help="Samples per size bucket")
+    dry_run.add_argument('--max-bandwidth', type=float,
+                         help="Aggregate network bandwidth cap in bytes/s (upper bound for predictions)")
+    dry_run.set_defaults(func=cmd_dry_run)
+
+    migrate = subparsers.add_parser('migrate', help="Run migration")
+    add_bucket_args(migrate)
+    migrate.add_argument('--retry-from', help="Verification report to re-migrate mismatched keys from")
+    migrate.add_argument('--workers', dest='transfer_workers', type=int, default=1, help="Concurrent transfers (see dry-run recommendation)")
+    migrate.add_argument('--part-size', type=int, help="Multipart threshold/chunk size in bytes (see dry-run recommendation)")
+    add_timeout_args(migrate)
+    migrate.set_defaults(func=cmd_migrate)
+
+    pack = subparsers.add_parser('pack', help="Migrate with small objects packed into bundles")
+    add_bucket_args(pack)
+    pack.add_argument('--threshold', type=int, default=64 * 1024, help="Pack objects smaller than this (bytes)")
+    pack.add_argument('--bundle-size', type=int, default=64 * 1024 * 1024, help="Target bundle size (bytes)")
+    pack.add_argument('--format', choices=['tar', 'blob'], default='tar', help="Bundle format")
+    pack.add_argument('--group-depth', type=int, default=1,
+                      help="Key path depth that groups objects into bundles (0: whole bucket, 1: top-level prefix)")
+    pack.add_argument('--bundle-workers', type=int, default=4, help="Bundles built concurrently")
+    add_timeout_args(pack)
+    pack.set_defaults(func=cmd_pack)
+
+    verify = subparsers.add_parser('verify', help="Verify destination against source")
+    add_bucket_args(verify)
+    verify.add_argument('--level', choices=['sampled', 'etag', 'full'], default='etag',
+                        help="sampled (source listing + HEAD of a sample) < etag (both listings, size+ETag) < full (+ content hash)")
+    verify.add_argument('--sample-rate', type=float, default=0.01, help="Fraction checked in sampled mode")
+    verify.add_argument('--workers', type=int, help="Process pool size for full mode")
+    verify.set_defaults(func=cmd_verify)
+
+    replay = subparsers.add_parser('replay', help="Retry only keys recorded in the dead-letter file")
+    add_bucket_args(replay)
+    replay.add_argument('--workers', type=int, default=8, help="Replay concurrency")
+    replay.add_argument('--retries', type=int, default=2, help="Attempts per key in this replay")
+    replay.add_argument('--backoff', type=float, default=1.0, help="Base backoff seconds (doubles per attempt)")
+    replay.add_argument('--quarantine-after', type=int, default=10,
+                        help="Quarantine keys whose total attempts reach this")
+    add_timeout_args(replay)
+    replay.set_defaults(func=cmd_replay)
+
+    coldstart = subparsers.add_parser('coldstart', help="Measure client cold start time")
+    coldstart.set_defaults(func=cmd_coldstart)
+
+    return parser
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import threading
+import time
+
+# NCP / AWS 기본 설정
+NCP_ENDPOINT = 'https://kr.object.ncloudstorage.com'
+AWS_REGION = 'ap-northeast-2'
+# 요청 타임아웃 기본값 (초) - 응답 없는 GET/PUT이 워커를 오래 붙잡지 않도록
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+
+# 프로세스 단위 캐시 - 세션은 fork 후에도 재사용 (서비스 모델 캐시 유지),
+# 클라이언트는 커넥션 풀을 공유하면 안 되므로 자식 프로세스에서 새로 생성
+_lock = threading.Lock()
+_state = {
+    'pid': None,
+    'session': None,
+    'clients': {}
+}
+
+
+def _reset_after_fork():
+    """fork된 자식 프로세스에서 클라이언트 캐시 초기화"""
+    global _lock
+    _lock = threading.Lock()
+    _state['pid'] = os.getpid()
+    _state['clients'] = {}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_session():
+    """프로세스 공용 boto3 세션 반환 (최초 호출 시 생성)"""
+    if _state['session'] is None:
+        with _lock:
+            if _state['session'] is None:
+                # boto3 import 자체를 첫 사용 시점까지 지연
+                import boto3
+                _state['session'] = boto3.session.Session()
+                _state['pid'] = os.getpid()
+    return _state['session']
+
+
+def get_client(service_name: str, region_name: str = None, endpoint_url: str = None,
+               aws_access_key_id: str = None, aws_secret_access_key: str = None,
+               signature_version: str = None, max_pool_connections: int = None,
+               connect_timeout: float = None, read_timeout: float = None):
+    """동일 설정의 클라이언트는 프로세스 내에서 한 번만 생성하여 재사용"""
+    if _state['pid'] not in (None, os.getpid()):
+        # register_at_fork를 지원하지 않는 환경 대비
+        _reset_after_fork()
+
+    # 같은 access key라도 secret이 바뀌면 (키 교체) 새 클라이언트 생성 - 캐시에는 해시만 보관
+    secret_digest = hashlib.sha256(aws_secret_access_key.encode()).hexdigest() if aws_secret_access_key else None
+    cache_key = (service_name, region_name, endpoint_url, aws_access_key_id, secret_digest,
+                 signature_version, max_pool_connections, connect_timeout, read_timeout)
+    client = _state['clients'].get(cache_key)
+    if client is not None:
+        return client
+
+    session = get_session()
+    with _lock:
+        client = _state['clients'].get(cache_key)
+        if client is None:
+            from botocore.config import Config
+            config_args = {}
+            if signature_version:
+                config_args['signature_version'] = signature_version
+            if max_pool_connections:
+                config_args['max_pool_connections'] = max_pool_connections
+            if connect_timeout:
+                config_args['connect_timeout'] = connect_timeout
+            if read_timeout:
+                config_args['read_timeout'] = read_timeout
+
+            client = session.client(
+                service_name,
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                aws_access_key_id=aws_access_key_id,
+                aws_secret_access_key=aws_secret_access_key,
+                config=Config(**config_args)
+            )
+            _state['clients'][cache_key] = client
+    return client
+
+
+def ncp_s3_client(access_key: str = None, secret_key: str = None, **kwargs):
+    """NCP Object Storage 클라이언트"""
+    return get_client(
+        's3',
+        endpoint_url=NCP_ENDPOINT,
+        aws_access_key_id=access_key or os.getenv('NCP_ACCESS_KEY'),
+        aws_secret_access_key=secret_key or os.getenv('NCP_SECRET_KEY'),
+        signature_version='s3v4',
+        **kwargs
+    )
+
+
+def aws_client(service_name: str = 's3', access_key: str = None, secret_key: str = None,
+               region: str = AWS_REGION, **kwargs):
+    """AWS 서비스 클라이언트 (s3, sqs, sns 등)"""
+    return get_client(
+        service_name,
+        region_name=region,
+        aws_access_key_id=access_key or os.getenv('AWS_ACCESS_KEY'),
+        aws_secret_access_key=secret_key or os.getenv('AWS_SECRET_KEY'),
+        **kwargs
+    )
+
+
+def preload(services=('s3',)):
+    """워커 fork 전에 부모 프로세스에서 서비스 모델을 미리 로드"""
+    for service_name in services:
+        # 부모에서 클라이언트를 한 번 생성하면 세션의 서비스 모델 캐시가 채워짐
+        # (클라이언트 자체는 fork 후 자식에서 초기화되므로 커넥션 풀은 공유되지 않음)
+        aws_client(service_name)
+
+
+def measure_cold_start():
+    """세션/클라이언트 생성 단계별 소요시간 측정 (초)"""
+    timings = {}
+
+    start = time.perf_counter()
+    get_session()
+    timings['session'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ncp_s3_client()
+    timings['ncp_client'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    aws_client('s3')
+    timings['aws_client'] = time.perf_counter() - start
+
+    timings['total'] = sum(timings.values())
+    return timings
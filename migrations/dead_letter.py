@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+# 누적 시도 횟수가 이 값 이상이면 격리 (poison key)
+DEFAULT_QUARANTINE_AFTER = 10
+
+
+def default_dead_letter_path(bucket: str) -> str:
+    """버킷별 dead-letter 파일 경로"""
+    return f'logs/dead_letter_{bucket}.jsonl'
+
+
+def default_quarantine_path(bucket: str) -> str:
+    """버킷별 quarantine 파일 경로"""
+    return f'logs/quarantine_{bucket}.jsonl'
+
+
+class DeadLetterQueue:
+    """실패한 객체를 JSON Lines 파일에 기록 (키, 크기, 오류 종류, 시도 횟수, 시각)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def build_record(self, obj: dict, error=None, attempts: int = 1) -> dict:
+        """기록 항목 생성"""
+        return {
+            'key': obj['Key'],
+            'size': obj.get('Size'),
+            'error_class': type(error).__name__ if error is not None else None,
+            'error': str(error) if error is not None else None,
+            'attempts': attempts,
+            'timestamp': datetime.now().isoformat()
+        }
+
+    def append(self, obj: dict, error=None, attempts: int = 1):
+        """실패 항목 1건 추가"""
+        return self.append_record(self.build_record(obj, error, attempts))
+
+    def append_record(self, record: dict):
+        """이미 만들어진 항목 추가 (오류 정보 등을 그대로 보존)"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        return record
+
+    def resolve(self, key: str):
+        """이후 성공한 키의 해제 항목 추가 - load 시 그 이전 기록은 무시"""
+        return self.append_record({'key': key, 'resolved': True, 'timestamp': datetime.now().isoformat()})
+
+    def load(self) -> dict:
+        """키별로 병합된 실패 항목 로드 (시도 횟수 누적, 마지막 오류 유지, 해제된 키 제외)"""
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get('resolved'):
+                    records.pop(record['key'], None)
+                    continue
+                previous = records.get(record['key'])
+                if previous is not None:
+                    record['attempts'] += previous['attempts']
+                records[record['key']] = record
+        return records
+
+    def rewrite(self, records):
+        """남은 실패 항목만으로 파일 재작성 (replay 후 정리)"""
+        with self.lock:
+            if not records:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+
+            temp_path = f'{self.path}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            os.replace(temp_path, self.path)
+
+    def keys(self) -> set:
+        """기록된 키 목록"""
+        return set(self.load())
@@ -0,0 +1,463 @@
+import itertools
+import json
+import math
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from client_factory import ncp_s3_client, aws_client
+from ncpos_2_aws_s3 import MigrationHandler, NCP_BUCKETS
+
+# 크기 구간 (상한, 라벨) - 마지막 구간은 상한 없음
+SIZE_BUCKETS = [
+    (1024, '<1KB'),
+    (64 * 1024, '1KB-64KB'),
+    (1024 * 1024, '64KB-1MB'),
+    (8 * 1024 * 1024, '1MB-8MB'),
+    (64 * 1024 * 1024, '8MB-64MB'),
+    (None, '>=64MB')
+]
+
+# 비용 단가 (USD) - 계약/리전에 맞게 조정
+DEFAULT_PRICING = {
+    'ncp_get_per_1000': 0.0004,
+    'aws_put_per_1000': 0.0045,
+    'aws_head_per_1000': 0.00035,
+    'ncp_egress_per_gb': 0.09
+}
+
+# 측정/예측할 워커 수 후보
+DEFAULT_WORKER_COUNTS = [1, 2, 4, 8, 16, 32, 64]
+# 동시성 측정 시 워커당 프로브 수
+PROBES_PER_WORKER = 4
+
+# 프로브 전송량 상한 - 대용량 객체는 앞부분만 Range GET 하여 전송
+MAX_PROBE_OBJECT_BYTES = 16 * 1024 * 1024
+MAX_PROBE_BYTES_PER_BUCKET = 256 * 1024 * 1024
+MAX_PROBE_BYTES_PER_LEVEL = 128 * 1024 * 1024
+
+MIN_PART_SIZE = 5 * 1024 * 1024
+# 측정값이 없을 때 요청 수 계산에 쓰는 파트 크기 (boto3 TransferConfig 기본값)
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024
+MAX_PARTS = 10000
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+PROBE_PREFIX = '_dry_run_probe/'
+
+
+def size_bucket_label(size):
+    """객체 크기에 해당하는 구간 라벨 반환"""
+    for limit, label in SIZE_BUCKETS:
+        if limit is None or size < limit:
+            return label
+
+
+def least_squares(points):
+    """(x, y) 점들에 대한 직선 y = intercept + slope * x 적합, x 분산이 0이면 None"""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+    return mean_y - slope * mean_x, slope
+
+
+def fit_linear_model(samples):
+    """(크기, 소요시간) 샘플로 시간 = 지연 + 크기 / 대역폭 모델 적합 (최소제곱법)"""
+    if not samples:
+        return {'latency': 0.0, 'bandwidth': None, 'samples': 0}
+
+    n = len(samples)
+    mean_y = sum(y for _, y in samples) / n
+    fitted = least_squares(samples)
+    if fitted is None or fitted[1] <= 0:
+        # 크기가 모두 같거나 크기에 따른 시간 증가가 관측되지 않으면 평균 지연만 사용
+        return {'latency': mean_y, 'bandwidth': None, 'samples': n}
+
+    latency, slope = fitted
+    return {'latency': max(latency, 0.0), 'bandwidth': 1.0 / slope, 'samples': n}
+
+
+def predict_seconds(model, size):
+    """적합된 모델로 단일 요청 소요시간 예측"""
+    seconds = model['latency']
+    if model['bandwidth']:
+        seconds += size / model['bandwidth']
+    return seconds
+
+
+def fit_saturation_model(speedups):
+    """워커 수별 측정 속도 향상으로 S(W) = S_max * W / (W + K) 포화 곡선 적합
+
+    1/S = 1/S_max + (K/S_max) * (1/W) 로 선형화하여 최소제곱법 적용.
+    포화가 관측되지 않으면 (S_max 추정 불가) 측정값을 그대로 사용.
+    """
+    points = [(1.0 / workers, 1.0 / speedup) for workers, speedup in speedups.items() if speedup > 0]
+    fitted = least_squares(points) if len(points) >= 2 else None
+    if fitted is None or fitted[0] <= 0 or fitted[1] < 0:
+        return {'max_speedup': None, 'half_saturation': None, 'measured': speedups}
+
+    intercept, slope = fitted
+    return {
+        'max_speedup': 1.0 / intercept,
+        'half_saturation': slope / intercept,
+        'measured': speedups
+    }
+
+
+def predict_speedup(model, workers):
+    """워커 수별 속도 향상 예측 - 측정한 워커 수는 측정값, 그 외는 포화 곡선 사용
+
+    워커를 늘려도 남는 워커는 쉬면 되므로 측정값은 더 적은 워커 수의 최댓값 이상으로 보정.
+    """
+    measured = model['measured']
+    if workers in measured:
+        best = max(speedup for count, speedup in measured.items() if count <= workers)
+        return max(min(best, workers), 1e-9)
+
+    if model['max_speedup'] is None:
+        # 측정 범위를 벗어나면 가장 가까운 측정값 사용
+        if not measured:
+            return 1.0
+        nearest = min(measured, key=lambda count: abs(count - workers))
+        return max(min(measured[nearest], workers), 1e-9)
+
+    speedup = model['max_speedup'] * workers / (workers + model['half_saturation'])
+    return max(min(speedup, workers), 1e-9)
+
+
+class MigrationEstimator:
+    """마이그레이션 사전 점검 (dry-run) - 샘플 전송으로 소요시간/요청수/비용 예측"""
+
+    def __init__(self, handler: MigrationHandler, samples_per_bucket: int = 200,
+                 worker_counts=None, pricing=None, max_bandwidth=None,
+                 probes_per_worker: int = PROBES_PER_WORKER):
+        self.handler = handler
+        self.logger = handler.logger
+        self.samples_per_bucket = samples_per_bucket
+        self.worker_counts = sorted(worker_counts or DEFAULT_WORKER_COUNTS)
+        self.pricing = {**DEFAULT_PRICING, **(pricing or {})}
+        # 전체 네트워크 대역폭 상한 (bytes/s), 알고 있으면 지정
+        self.max_bandwidth = max_bandwidth
+        self.probes_per_worker = probes_per_worker
+        self.probe_prefix = f"{PROBE_PREFIX}{datetime.now().strftime('%Y%m%d_%H%M%S')}/"
+        self.probe_ids = itertools.count()
+
+        # 최대 워커 수만큼 동시 요청이 가능하도록 커넥션 풀 크기 지정
+        pool_size = max(self.worker_counts[-1], 10)
+        self.ncp_client = ncp_s3_client(max_pool_connections=pool_size)
+        self.aws_client = aws_client('s3', max_pool_connections=pool_size)
+
+    def select_samples(self, objects):
+        """크기 구간별로 샘플 객체 선택 (구간별 개수/전송량 상한 적용)"""
+        buckets = {}
+        for obj in objects:
+            buckets.setdefault(size_bucket_label(obj['Size']), []).append(obj)
+
+        samples = {}
+        for label, bucket_objects in buckets.items():
+            candidates = random.sample(bucket_objects, min(self.samples_per_bucket, len(bucket_objects)))
+            selected, probe_bytes = [], 0
+            for obj in candidates:
+                size = min(obj['Size'], MAX_PROBE_OBJECT_BYTES)
+                if selected and probe_bytes + size > MAX_PROBE_BYTES_PER_BUCKET:
+                    break
+                selected.append(obj)
+                probe_bytes += size
+            samples[label] = selected
+        return samples
+
+    def probe_object(self, obj):
+        """샘플 객체 1개를 실제로 GET/HEAD/PUT 하여 소요시간 측정"""
+        key = obj['Key']
+        probe_key = f"{self.probe_prefix}{next(self.probe_ids)}/{key}"
+        request = {'Bucket': self.handler.source_bucket, 'Key': key}
+        if obj['Size'] > MAX_PROBE_OBJECT_BYTES:
+            # 대용량 객체는 앞부분만 전송 - 모델은 실제 전송 바이트 기준으로 적합
+            request['Range'] = f"bytes=0-{MAX_PROBE_OBJECT_BYTES - 1}"
+
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as buffer:
+            start = time.perf_counter()
+            response = self.ncp_client.get_object(**request)
+            for chunk in response['Body'].iter_chunks():
+                buffer.write(chunk)
+            get_seconds = time.perf_counter() - start
+            size = buffer.tell()
+            buffer.seek(0)
+
+            start = time.perf_counter()
+            try:
+                self.aws_client.head_object(Bucket=self.handler.dest_bucket, Key=probe_key)
+            except Exception:
+                pass
+            head_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            self.aws_client.upload_fileobj(buffer, self.handler.dest_bucket, probe_key)
+            put_seconds = time.perf_counter() - start
+
+        try:
+            self.aws_client.delete_object(Bucket=self.handler.dest_bucket, Key=probe_key)
+        except Exception as e:
+            self.logger.warning(f"Failed to delete probe object {probe_key}: {str(e)}")
+
+        return size, get_seconds, head_seconds, put_seconds
+
+    def try_probe(self, obj):
+        """프로브 실패 시 None 반환"""
+        try:
+            return self.probe_object(obj)
+        except Exception as e:
+            self.logger.error(f"Probe failed for {obj['Key']}: {str(e)}")
+            return None
+
+    def measure(self, samples):
+        """샘플 전송을 순차 수행하여 GET/HEAD/PUT 측정값 수집"""
+        measurements = {'get': [], 'head': [], 'put': []}
+
+        for label, objects in samples.items():
+            self.logger.info(f"Probing {len(objects)} objects in size bucket {label}")
+            for obj in objects:
+                result = self.try_probe(obj)
+                if result is None:
+                    continue
+                size, get_s, head_s, put_s = result
+                measurements['get'].append((size, get_s))
+                measurements['head'].append((0, head_s))
+                measurements['put'].append((size, put_s))
+
+        return measurements
+
+    def build_level_batch(self, objects, workers):
+        """워커 수별 동시성 측정용 프로브 목록 (전송량 상한, 최소 워커 수만큼)"""
+        target = workers * self.probes_per_worker
+        shuffled = random.sample(objects, len(objects))
+        batch, probe_bytes = [], 0
+        for obj in itertools.islice(itertools.cycle(shuffled), target):
+            size = min(obj['Size'], MAX_PROBE_OBJECT_BYTES)
+            if len(batch) >= workers and probe_bytes + size > MAX_PROBE_BYTES_PER_LEVEL:
+                break
+            batch.append(obj)
+            probe_bytes += size
+        return batch
+
+    def measure_concurrency(self, objects, models):
+        """워커 수별로 실제 동시 프로브를 실행하여 속도 향상(순차 대비 처리량) 측정"""
+        speedups = {}
+        if not objects:
+            return speedups
+
+        for workers in self.worker_counts:
+            batch = self.build_level_batch(objects, workers)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = [r for r in executor.map(self.try_probe, batch) if r is not None]
+            elapsed = time.perf_counter() - start
+            if not results or elapsed <= 0:
+                continue
+
+            # 같은 작업을 순차로 처리했을 때의 예상 소요시간 대비 실제 소요시간
+            sequential = sum(
+                predict_seconds(models['get'], size)
+                + predict_seconds(models['head'], 0)
+                + predict_seconds(models['put'], size)
+                for size, _, _, _ in results
+            )
+            speedups[workers] = sequential / elapsed
+            self.logger.info(f"Concurrency probe: {workers} workers -> speedup {speedups[workers]:.2f}x")
+
+        return speedups
+
+    def recommend_part_size(self, put_model, largest_size):
+        """PUT 모델 기준으로 멀티파트 파트 크기 추천"""
+        part_size = MIN_PART_SIZE
+        if put_model['bandwidth']:
+            # 요청 지연이 파트 전송시간의 10% 이하가 되도록
+            part_size = max(part_size, int(put_model['latency'] * put_model['bandwidth'] * 10))
+        # 가장 큰 객체도 파트 수 제한을 넘지 않도록
+        part_size = max(part_size, math.ceil(largest_size / MAX_PARTS))
+        # MB 단위로 올림
+        mb = 1024 * 1024
+        part_size = math.ceil(part_size / mb) * mb
+        return min(part_size, MAX_PART_SIZE)
+
+    def count_requests(self, objects, head_only, part_size):
+        """요청 수 계산 - 모든 객체 HEAD 1회, 전송 대상만 GET 1회 + PUT 또는 멀티파트"""
+        requests = {'ncp_get': 0, 'aws_head': head_only, 'aws_put': 0}
+        for obj in objects:
+            requests['ncp_get'] += 1
+            requests['aws_head'] += 1
+            if obj['Size'] >= part_size:
+                # create + parts + complete
+                requests['aws_put'] += math.ceil(obj['Size'] / part_size) + 2
+            else:
+                requests['aws_put'] += 1
+        return requests
+
+    def estimate_cost(self, requests, total_bytes):
+        """요청 수/전송량 기준 비용 추정"""
+        return {
+            'ncp_get': requests['ncp_get'] / 1000 * self.pricing['ncp_get_per_1000'],
+            'aws_head': requests['aws_head'] / 1000 * self.pricing['aws_head_per_1000'],
+            'aws_put': requests['aws_put'] / 1000 * self.pricing['aws_put_per_1000'],
+            'ncp_egress': total_bytes / (1024 ** 3) * self.pricing['ncp_egress_per_gb']
+        }
+
+    def predict_wall_clock(self, objects, head_only, models, concurrency_model):
+        """워커 수별 예상 소요시간 계산 (측정된 포화 곡선 기준)"""
+        per_object = [
+            predict_seconds(models['head'], 0)
+            + predict_seconds(models['get'], obj['Size'])
+            + predict_seconds(models['put'], obj['Size'])
+            for obj in objects
+        ]
+        # 이미 존재하는 객체는 HEAD 1회 후 건너뜀
+        total_seconds = sum(per_object) + head_only * predict_seconds(models['head'], 0)
+        longest = max(per_object, default=0)
+        total_bytes = sum(obj['Size'] for obj in objects)
+
+        predictions = {}
+        for workers in self.worker_counts:
+            seconds = max(total_seconds / predict_speedup(concurrency_model, workers), longest)
+            if self.max_bandwidth:
+                seconds = max(seconds, total_bytes / self.max_bandwidth)
+            predictions[workers] = seconds
+        return predictions
+
+    def recommend_workers(self, predictions):
+        """워커 수를 늘려도 10% 이상 개선되지 않는 최소 워커 수 추천"""
+        counts = sorted(predictions)
+        for current, following in zip(counts, counts[1:]):
+            if predictions[following] > predictions[current] * 0.9:
+                return current
+        return counts[-1]
+
+    def run(self, prefix: str = ""):
+        """dry-run 실행 - 계획 수립, 샘플 측정, 모델 적합 및 예측"""
+        self.logger.info("Starting dry-run estimation...")
+        plan = self.handler.plan_migration(prefix)
+        pending = plan['pending']
+        # 묶음(pack)으로 옮긴 객체는 HEAD도 하지 않음
+        head_only = plan['total_objects'] - len(pending) - plan['packed']
+        pending_bytes = sum(obj['Size'] for obj in pending)
+
+        samples = self.select_samples(pending)
+        measurements = self.measure(samples)
+        models = {name: fit_linear_model(values) for name, values in measurements.items()}
+
+        warning = None
+        if not measurements['put']:
+            # 측정값 없이 적합한 모델은 지연 0 - 소요시간 0초 / 최대 워커 수 추천이 되므로 예측 생략
+            warning = ("No objects to migrate" if not pending
+                       else f"All {sum(len(objects) for objects in samples.values())} probes failed "
+                            f"(check GetObject/PutObject permissions)")
+            self.logger.warning(f"{warning} - skipping wall clock prediction and recommendation")
+
+        sampled_objects = [obj for objects in samples.values() for obj in objects]
+        speedups = {} if warning else self.measure_concurrency(sampled_objects, models)
+        concurrency_model = fit_saturation_model(speedups)
+
+        largest = max((obj['Size'] for obj in pending), default=0)
+        part_size = DEFAULT_PART_SIZE if warning else self.recommend_part_size(models['put'], largest)
+        requests = self.count_requests(pending, head_only, part_size)
+        cost = self.estimate_cost(requests, pending_bytes)
+        predictions, recommendation = {}, None
+        if warning is None:
+            predictions = self.predict_wall_clock(pending, head_only, models, concurrency_model)
+            recommendation = {
+                # cli.py migrate --workers / --part-size 로 적용
+                'max_workers': self.recommend_workers(predictions),
+                'part_size': part_size
+            }
+
+        bucket_counts = {}
+        for obj in pending:
+            label = size_bucket_label(obj['Size'])
+            bucket_counts[label] = bucket_counts.get(label, 0) + 1
+
+        report = {
+            'source_bucket': self.handler.source_bucket,
+            'dest_bucket': self.handler.dest_bucket,
+            'prefix': prefix,
+            'plan': {k: v for k, v in plan.items() if k not in ('pending', 'outdated')},
+            'pending_objects': len(pending),
+            'pending_bytes': pending_bytes,
+            'size_buckets': bucket_counts,
+            'sampled': {label: len(objects) for label, objects in samples.items()},
+            'models': models,
+            'concurrency': concurrency_model,
+            'requests': requests,
+            'cost_usd': {**cost, 'total': sum(cost.values())},
+            'wall_clock_seconds': predictions,
+            'recommendation': recommendation,
+            'warning': warning
+        }
+
+        self.log_report(report)
+        return report
+
+    def log_report(self, report):
+        """추정 결과 출력"""
+        lines = [
+            f"\nDry-run Estimation Results:",
+            f"Objects to migrate: {report['pending_objects']} "
+            f"({self.handler.format_size(report['pending_bytes'])})",
+            f"Size buckets: {report['size_buckets']}"
+        ]
+        for name, model in report['models'].items():
+            bandwidth = model['bandwidth']
+            bandwidth_text = f"{self.handler.format_size(bandwidth)}/s" if bandwidth else "n/a"
+            lines.append(
+                f"{name.upper()} model: latency {model['latency'] * 1000:.1f} ms, "
+                f"bandwidth {bandwidth_text} ({model['samples']} samples)"
+            )
+        concurrency = report['concurrency']
+        if concurrency['max_speedup'] is not None:
+            lines.append(
+                f"Concurrency model: max speedup {concurrency['max_speedup']:.1f}x, "
+                f"half saturation at {concurrency['half_saturation']:.1f} workers"
+            )
+        lines.append(f"Requests: {report['requests']}")
+        lines.append(f"Estimated cost: ${report['cost_usd']['total']:.4f}")
+        for workers, seconds in report['wall_clock_seconds'].items():
+            lines.append(f"  {workers:>3} workers: {self.handler.format_time(seconds)}")
+        recommendation = report['recommendation']
+        if recommendation is None:
+            lines.append(f"No recommendation: {report['warning']}")
+            self.logger.info("\n".join(lines))
+            return
+        lines.append(
+            f"Recommended: --workers {recommendation['max_workers']} "
+            f"--part-size {recommendation['part_size']} "
+            f"({self.handler.format_size(recommendation['part_size'])})"
+        )
+        self.logger.info("\n".join(lines))
+
+    def save_report(self, report, filename=None):
+        """추정 결과를 JSON 파일로 저장"""
+        if filename is None:
+            os.makedirs('logs', exist_ok=True)
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f'logs/dry_run_{self.handler.source_bucket}_{timestamp}.json'
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        return filename
+
+
+if __name__ == "__main__":
+    for bucket in NCP_BUCKETS:
+        handler = MigrationHandler(
+            source_bucket=bucket,
+            dest_bucket=bucket
+        )
+        estimator = MigrationEstimator(handler)
+        report = estimator.run()
+        print(f"Dry-run report saved to: {estimator.save_report(report)}")
@@ -1,12 +1,21 @@
-import boto3
-from botocore.client import Config
 import os
 from datetime import datetime, timedelta
 import logging
 from dotenv import load_dotenv
 import time
 import concurrent.futures
+import mimetypes
+from functools import lru_cache
 from itertools import islice
+from urllib.parse import urlencode, parse_qsl, quote
+from client_factory import ncp_s3_client, aws_client, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+import threading
+from dead_letter import (
+    DeadLetterQueue,
+    DEFAULT_QUARANTINE_AFTER,
+    default_dead_letter_path,
+    default_quarantine_path
+)
 
 load_dotenv()
 
@@ -19,46 +28,127 @@ aws_secret_key = os.getenv('AWS_SECRET_KEY')
 ncp_bucket_name = os.getenv('NCP_BUCKET_NAME')
 aws_bucket_name = os.getenv('AWS_BUCKET_NAME')
 
+# 대상 객체의 스토리지 클래스 (예: STANDARD_IA, INTELLIGENT_TIERING)
+aws_storage_class = os.getenv('AWS_STORAGE_CLASS')
+# 대상 객체 태그 (예: project=migration&owner=infra)
+aws_object_tagging = dict(parse_qsl(os.getenv('AWS_OBJECT_TAGGING', '')))
+
 # NCP 버킷 목록 정의
 NCP_BUCKETS = [
     "dentop02"
 ]
 
+# GET 응답에서 PUT/멀티파트 생성 요청으로 그대로 전달할 헤더
+PRESERVED_HEADERS = [
+    'ContentType',
+    'CacheControl',
+    'ContentDisposition',
+    'ContentEncoding',
+    'ContentLanguage',
+    'Expires',
+    'Metadata'
+]
+
+# 원본에 의미 있는 Content-Type이 없는 것으로 간주하는 값
+GENERIC_CONTENT_TYPES = {'', 'binary/octet-stream', 'application/octet-stream'}
+
+
+@lru_cache(maxsize=1024)
+def guess_content_type(extension: str):
+    """확장자별 Content-Type 추론 (결과 캐시)"""
+    return mimetypes.guess_type(f"object{extension}")[0]
+
+
+def encode_tagging(tagging: dict) -> str:
+    """태그 딕셔너리를 S3 Tagging 헤더 형식으로 인코딩"""
+    return urlencode(tagging, quote_via=quote)
+
+
+def build_upload_args(response: dict, storage_class: str = None, tagging: dict = None) -> dict:
+    """GET 응답 헤더로 업로드 ExtraArgs 생성 - 추가 HEAD 요청 없이 메타데이터 보존"""
+    extra_args = {
+        header: response[header]
+        for header in PRESERVED_HEADERS
+        if response.get(header)
+    }
+    
+    if extra_args.get('ContentType', '') in GENERIC_CONTENT_TYPES:
+        _, extension = os.path.splitext(response.get('Key', ''))
+        content_type = guess_content_type(extension.lower()) if extension else None
+        if content_type:
+            extra_args['ContentType'] = content_type
+    
+    if storage_class:
+        extra_args['StorageClass'] = storage_class
+    if tagging:
+        extra_args['Tagging'] = encode_tagging(tagging)
+    
+    return extra_args
+
+def etags_comparable(source_etag: str, dest_etag: str) -> bool:
+    """두 ETag가 모두 단일 업로드(MD5)인 경우에만 비교 가능"""
+    return '-' not in source_etag and '-' not in dest_etag
+
+
 class MigrationHandler:
-    def __init__(self, source_bucket, dest_bucket):
-        self.setup_clients()
+    def __init__(self, source_bucket, dest_bucket, storage_class=None, tagging=None,
+                 dead_letter_path=None, quarantine_path=None, max_workers=1, part_size=None,
+                 quarantine_after=DEFAULT_QUARANTINE_AFTER, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT):
+        # 동시 전송 수 / 멀티파트 파트 크기 (dry-run 추천값 적용용)
+        self.max_workers = max(max_workers, 1)
+        self.transfer_config = None
+        if part_size:
+            from boto3.s3.transfer import TransferConfig
+            self.transfer_config = TransferConfig(
+                multipart_threshold=part_size,
+                multipart_chunksize=part_size
+            )
+        self.setup_clients(connect_timeout, read_timeout)
         self.setup_logging()
         self.source_bucket = source_bucket
         self.dest_bucket = dest_bucket
+        self.storage_class = storage_class or aws_storage_class
+        self.tagging = tagging or aws_object_tagging
+        # 실패 객체 기록 및 반복 실패(poison) 객체 격리 목록
+        self.dead_letter = DeadLetterQueue(dead_letter_path or default_dead_letter_path(source_bucket))
+        self.quarantine = DeadLetterQueue(quarantine_path or default_quarantine_path(source_bucket))
+        self.quarantined = self.quarantine.keys()
+        self.quarantine_after = quarantine_after
+        # 키별 누적 실패 시도 횟수 - 이전 실행의 dead-letter 기록 포함
+        self.failure_attempts = {
+            key: record['attempts'] for key, record in self.dead_letter.load().items()
+        }
+        self.failure_lock = threading.Lock()
         self.start_time = None
         self.stats = {
             'total': 0,
             'success': 0,
             'skipped': 0,
             'failed': 0,
+            'quarantined': 0,
             'total_bytes': 0,
             'transferred_bytes': 0
         }
 
-    def setup_clients(self):
-        """NCP와 AWS 클라이언트 설정"""
-        self.ncp_client = boto3.client(
-            's3',
-            aws_access_key_id=ncp_access_key,
-            aws_secret_access_key=ncp_secret_key,
-            endpoint_url='https://kr.object.ncloudstorage.com',
-            config=Config(signature_version='s3v4')
-        )
-        
-        self.aws_client = boto3.client(
-            's3',
-            aws_access_key_id=aws_access_key,
-            aws_secret_access_key=aws_secret_key,
-            region_name='ap-northeast-2'
-        )
+    def setup_clients(self, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT):
+        """NCP와 AWS 클라이언트 설정 (프로세스 공용 팩토리에서 재사용)"""
+        client_options = {
+            # 워커 수가 기본 커넥션 풀(10)보다 많으면 풀 크기를 맞춤
+            'max_pool_connections': self.max_workers if self.max_workers > 10 else None,
+            'connect_timeout': connect_timeout,
+            'read_timeout': read_timeout
+        }
+        self.ncp_client = ncp_s3_client(ncp_access_key, ncp_secret_key, **client_options)
+        self.aws_client = aws_client('s3', aws_access_key, aws_secret_key, **client_options)
 
     def setup_logging(self):
-        """로깅 설정"""
+        """로깅 설정 - 프로세스당 한 번만 핸들러 구성"""
+        self.logger = logging.getLogger(__name__)
+        root_logger = logging.getLogger()
+        if root_logger.handlers:
+            return
+        
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         log_filename = f'logs/migration_{timestamp}.log'
         
@@ -73,7 +163,6 @@ class MigrationHandler:
                 logging.StreamHandler()
             ]
         )
-        self.logger = logging.getLogger(__name__)
 
     def list_objects(self, prefix: str = "") -> list:
         """NCP 버킷의 객체 리스트 조회"""
@@ -101,51 +190,63 @@ class MigrationHandler:
         """초 단위 시간을 읽기 쉬운 형식으로 변환"""
         return str(timedelta(seconds=int(seconds)))
 
-    def migrate_object(self, obj: dict, retry_count: int = 3) -> bool:
-        """단일 객체 마이그레이션 - AWS S3에 없는 경우에만 마이그레이션"""
+    def migrate_object(self, obj: dict, retry_count: int = 3, overwrite: bool = False,
+                       backoff: float = 0) -> bool:
+        """단일 객체 마이그레이션 - AWS S3에 없는 경우에만 마이그레이션 (overwrite 시 항상 전송)"""
         object_key = obj['Key']
+        obj['attempts'] = 0
         
-        try:
-            # AWS S3에 해당 객체가 있는지 확인
+        if not overwrite:
+            # AWS S3에 해당 객체가 있는지 확인 - 이미 있으면 스킵
             try:
                 self.aws_client.head_object(
                     Bucket=self.dest_bucket,
                     Key=object_key
                 )
-                # 객체가 이미 존재하면 스킵
                 self.logger.info(f"Object already exists in S3, skipping: {object_key}")
                 obj['migration_status'] = 'skipped'
                 return True
-            except:
+            except Exception:
                 # 객체가 없는 경우에만 마이그레이션 진행
-                for attempt in range(retry_count):
-                    try:
-                        # NCP에서 객체 다운로드
-                        response = self.ncp_client.get_object(
-                            Bucket=self.source_bucket,
-                            Key=object_key
-                        )
-                        
-                        # AWS에 업로드 (폴더 구조 유지)
-                        self.aws_client.upload_fileobj(
-                            response['Body'],
-                            self.dest_bucket,
-                            object_key  # 원본 경로 그대로 사용하여 폴더 구조 유지
-                        )
-                        
-                        self.logger.info(f"Successfully migrated: {object_key}")
-                        return True
-                        
-                    except Exception as e:
-                        self.logger.error(f"Error migrating {object_key}: {str(e)}")
-                        if attempt == retry_count - 1:  # 마지막 시도였다면
-                            return False
-                        
-                        self.logger.info(f"Retrying... ({attempt + 1}/{retry_count})")
+                pass
         
-        except Exception as e:
-            self.logger.error(f"Unexpected error with {object_key}: {str(e)}")
-            return False
+        for attempt in range(retry_count):
+            obj['attempts'] = attempt + 1
+            try:
+                # NCP에서 객체 다운로드
+                response = self.ncp_client.get_object(
+                    Bucket=self.source_bucket,
+                    Key=object_key
+                )
+                
+                # GET 응답의 헤더/메타데이터를 그대로 전달
+                extra_args = build_upload_args(
+                    {**response, 'Key': object_key},
+                    storage_class=self.storage_class,
+                    tagging=self.tagging
+                )
+                
+                # AWS에 업로드 (폴더 구조 유지)
+                self.aws_client.upload_fileobj(
+                    response['Body'],
+                    self.dest_bucket,
+                    object_key,  # 원본 경로 그대로 사용하여 폴더 구조 유지
+                    ExtraArgs=extra_args,
+                    Config=self.transfer_config
+                )
+                
+                self.logger.info(f"Successfully migrated: {object_key}")
+                return True
+                
+            except Exception as e:
+                obj['last_error'] = e
+                self.logger.error(f"Error migrating {object_key}: {str(e)}")
+                if attempt == retry_count - 1:  # 마지막 시도였다면
+                    return False
+                
+                self.logger.info(f"Retrying... ({attempt + 1}/{retry_count})")
+                if backoff:
+                    time.sleep(backoff * (2 ** attempt))
         
         return False
 
@@ -170,6 +271,9 @@ class MigrationHandler:
         # ETag 비교 (MD5 체크섬)
         ncp_etag = ncp_obj['ETag'].strip('"')
         aws_etag = aws_obj['ETag'].strip('"')
+        if not etags_comparable(ncp_etag, aws_etag):
+            # 멀티파트 ETag는 MD5가 아니므로 크기 일치로 판단
+            return True
         return ncp_etag == aws_etag
 
     def get_aws_objects(self, prefix: str = "") -> dict:
@@ -188,46 +292,74 @@ class MigrationHandler:
             self.logger.error(f"Error listing AWS objects: {str(e)}")
             raise
 
-    def analyze_migration_needs(self, prefix: str = ""):
-        """마이그레이션 필요성 분석"""
-        self.logger.info("Analyzing migration needs...")
-        
-        # NCP와 AWS의 객체 목록 조회
+    def load_packed(self) -> dict:
+        """대상 버킷의 묶음(pack) 인덱스 로드 - 키 -> (묶음, 멤버 정보, 생성 시각)"""
+        # packing 모듈이 이 모듈을 import 하므로 사용 시점에 import
+        from packing import PackedObjectReader
+        return PackedObjectReader(self.aws_client, self.dest_bucket).load()
+
+    def without_packed(self, objects):
+        """이미 묶음으로 옮긴 (원본 ETag가 같은) 객체 제외 - 개별 업로드로 묶음을 되돌리지 않도록"""
+        from packing import is_packed_member
+        packed = self.load_packed()
+        if not packed:
+            return objects
+        remaining = [obj for obj in objects if not is_packed_member(obj, packed)]
+        self.logger.info(f"Skipping {len(objects) - len(remaining)} objects already stored in bundles")
+        return remaining
+
+    def plan_migration(self, prefix: str = ""):
+        """NCP/AWS 목록을 비교하여 마이그레이션 대상 객체 계획 생성"""
+        from packing import is_packed_member
         ncp_objects = {obj['Key']: obj for obj in self.list_objects(prefix)}
         aws_objects = self.get_aws_objects(prefix)
+        packed = self.load_packed()
         
-        total_objects = len(ncp_objects)
-        existing_objects = 0
-        different_objects = 0
-        new_objects = 0
-        total_size = 0
+        plan = {
+            'total_objects': len(ncp_objects),
+            'existing_identical': 0,
+            'packed': 0,
+            'needs_update': 0,
+            'new_objects': 0,
+            'total_size': 0,
+            # 실제 전송 대상 (AWS에 없는 객체)
+            'pending': [],
+            # AWS에 있지만 내용이 다른 객체 - migrate_object는 HEAD 후 건너뜀
+            'outdated': []
+        }
         
         for key, ncp_obj in ncp_objects.items():
-            total_size += ncp_obj['Size']
+            plan['total_size'] += ncp_obj['Size']
             
             if key in aws_objects:
                 if self.compare_objects(ncp_obj, aws_objects[key]):
-                    existing_objects += 1
+                    plan['existing_identical'] += 1
                 else:
-                    different_objects += 1
+                    plan['needs_update'] += 1
+                    plan['outdated'].append(ncp_obj)
+            elif is_packed_member(ncp_obj, packed):
+                plan['packed'] += 1
             else:
-                new_objects += 1
+                plan['new_objects'] += 1
+                plan['pending'].append(ncp_obj)
         
-        analysis = {
-            'total_objects': total_objects,
-            'existing_identical': existing_objects,
-            'needs_update': different_objects,
-            'new_objects': new_objects,
-            'total_size': total_size
-        }
+        return plan
+
+    def analyze_migration_needs(self, prefix: str = ""):
+        """마이그레이션 필요성 분석"""
+        self.logger.info("Analyzing migration needs...")
+        
+        plan = self.plan_migration(prefix)
+        analysis = {k: v for k, v in plan.items() if k not in ('pending', 'outdated')}
         
         self.logger.info(
             f"\nMigration Analysis Results:\n"
-            f"Total objects in NCP: {total_objects}\n"
-            f"Already identical in AWS: {existing_objects}\n"
-            f"Need update (different): {different_objects}\n"
-            f"New objects to migrate: {new_objects}\n"
-            f"Total size to migrate: {self.format_size(total_size)}\n"
+            f"Total objects in NCP: {analysis['total_objects']}\n"
+            f"Already identical in AWS: {analysis['existing_identical']}\n"
+            f"Already packed in bundles: {analysis['packed']}\n"
+            f"Need update (different): {analysis['needs_update']}\n"
+            f"New objects to migrate: {analysis['new_objects']}\n"
+            f"Total size to migrate: {self.format_size(analysis['total_size'])}\n"
         )
         
         return analysis
@@ -237,58 +369,102 @@ class MigrationHandler:
         iterator = iter(lst)
         return iter(lambda: list(islice(iterator, chunk_size)), [])
 
+    def record_failure(self, obj: dict, error=None, count_attempts: bool = True):
+        """실패 객체를 dead-letter 파일에 기록 - 누적 시도 횟수가 기준 이상이면 격리
+
+        count_attempts=False 이면 객체 자체와 무관한 실패 (묶음 업로드 등) - replay 대상으로만 기록.
+        """
+        error = error or obj.get('last_error')
+        if not count_attempts:
+            self.dead_letter.append(obj, error=error, attempts=0)
+            return
+
+        attempts = max(obj.get('attempts', 0), 1)
+        with self.failure_lock:
+            total_attempts = self.failure_attempts.get(obj['Key'], 0) + attempts
+            self.failure_attempts[obj['Key']] = total_attempts
+
+        if total_attempts >= self.quarantine_after:
+            self.quarantine_record(self.dead_letter.build_record(obj, error, total_attempts))
+        else:
+            self.dead_letter.append(obj, error=error, attempts=attempts)
+
+    def record_success(self, obj: dict):
+        """이전에 실패했던 객체가 성공하면 누적 시도 횟수 초기화 및 dead-letter에서 해제"""
+        with self.failure_lock:
+            if self.failure_attempts.pop(obj['Key'], None) is None:
+                return
+        self.dead_letter.resolve(obj['Key'])
+
+    def quarantine_record(self, record: dict):
+        """반복 실패(poison) 객체를 격리 목록에 추가 - 이후 실행/replay에서 건너뜀"""
+        with self.failure_lock:
+            if record['key'] in self.quarantined:
+                return
+            self.quarantined.add(record['key'])
+        self.quarantine.append_record(record)
+        self.logger.warning(f"Quarantined after {record['attempts']} attempts: {record['key']}")
+
+    def migrate_and_classify(self, obj: dict, overwrite: bool = False) -> str:
+        """객체 1개 처리 후 결과 상태 반환 (success / skipped / failed / quarantined)"""
+        if obj['Key'] in self.quarantined:
+            # 반복 실패로 격리된 객체는 건너뜀 (replay 대상 아님)
+            return 'quarantined'
+        try:
+            if self.migrate_object(obj, overwrite=overwrite):
+                self.record_success(obj)
+                return 'skipped' if obj.get('migration_status') == 'skipped' else 'success'
+            self.record_failure(obj)
+        except Exception as e:
+            self.logger.error(f"Error processing {obj['Key']}: {str(e)}")
+            self.record_failure(obj, e)
+        return 'failed'
+
     def migrate_chunk(self, objects):
         """청크 단위 마이그레이션 처리"""
-        results = {'success': 0, 'failed': 0, 'skipped': 0, 'transferred_bytes': 0}
+        results = {'success': 0, 'failed': 0, 'skipped': 0, 'quarantined': 0, 'transferred_bytes': 0}
         
         for obj in objects:
-            try:
-                if self.migrate_object(obj):
-                    if obj.get('migration_status') == 'skipped':
-                        results['skipped'] += 1
-                    else:
-                        results['success'] += 1
-                        results['transferred_bytes'] += obj['Size']
-                else:
-                    results['failed'] += 1
-            except Exception as e:
-                self.logger.error(f"Error processing {obj['Key']}: {str(e)}")
-                results['failed'] += 1
+            status = self.migrate_and_classify(obj)
+            results[status] += 1
+            if status == 'success':
+                results['transferred_bytes'] += obj['Size']
         
         return results
 
-    def run_migration(self, prefix: str = ""):
-        """전체 마이그레이션 실행"""
+    def log_progress(self, done: int):
+        """진행률 계산 및 출력"""
+        progress = (done / self.stats['total']) * 100
+        elapsed_time = time.time() - self.start_time
+        speed = self.stats['transferred_bytes'] / elapsed_time if elapsed_time > 0 else 0
+        
+        self.logger.info(
+            f"Progress: {progress:.1f}% ({done}/{self.stats['total']}) | "
+            f"Speed: {self.format_size(speed)}/s | "
+            f"Elapsed: {self.format_time(elapsed_time)}\n"
+            f"Success: {self.stats['success']}, "
+            f"Skipped: {self.stats['skipped']}, "
+            f"Failed: {self.stats['failed']}, "
+            f"Quarantined: {self.stats['quarantined']}"
+        )
+
+    def run_migration(self, prefix: str = "", objects: list = None, overwrite: bool = False):
+        """전체 마이그레이션 실행 - objects 지정 시 해당 객체만 (재시도 목록 등)"""
         self.start_time = time.time()
-        objects = self.list_objects(prefix)
+        if objects is None:
+            objects = self.without_packed(self.list_objects(prefix))
         self.stats['total'] = len(objects)
         self.stats['total_bytes'] = sum(obj['Size'] for obj in objects)
         
-        self.logger.info(f"Starting migration of {self.stats['total']} objects")
+        self.logger.info(f"Starting migration of {self.stats['total']} objects with {self.max_workers} workers")
         
-        for i, obj in enumerate(objects, 1):
-            if self.migrate_object(obj):
-                if obj.get('migration_status') == 'skipped':
-                    self.stats['skipped'] += 1
-                else:
-                    self.stats['success'] += 1
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            statuses = executor.map(lambda obj: self.migrate_and_classify(obj, overwrite), objects)
+            for i, (obj, status) in enumerate(zip(objects, statuses), 1):
+                self.stats[status] += 1
+                if status == 'success':
                     self.stats['transferred_bytes'] += obj['Size']
-            else:
-                self.stats['failed'] += 1
-            
-            # 진행률 계산 및 출력
-            progress = (i / self.stats['total']) * 100
-            elapsed_time = time.time() - self.start_time
-            speed = self.stats['transferred_bytes'] / elapsed_time if elapsed_time > 0 else 0
-            
-            self.logger.info(
-                f"Progress: {progress:.1f}% ({i}/{self.stats['total']}) | "
-                f"Speed: {self.format_size(speed)}/s | "
-                f"Elapsed: {self.format_time(elapsed_time)}\n"
-                f"Success: {self.stats['success']}, "
-                f"Skipped: {self.stats['skipped']}, "
-                f"Failed: {self.stats['failed']}"
-            )
+                self.log_progress(i)
         
         total_time = time.time() - self.start_time
         self.logger.info(
@@ -297,6 +473,7 @@ class MigrationHandler:
             f"Successfully migrated: {self.stats['success']}\n"
             f"Skipped (already exist): {self.stats['skipped']}\n"
             f"Failed: {self.stats['failed']}\n"
+            f"Quarantined: {self.stats['quarantined']}\n"
             f"Total size: {self.format_size(self.stats['total_bytes'])}\n"
             f"Transferred size: {self.format_size(self.stats['transferred_bytes'])}\n"
             f"Average speed: {self.format_size(self.stats['transferred_bytes'] / total_time)}/s"
@@ -1,24 +1,13 @@
-import boto3
 import json
 from datetime import datetime
 from typing import Dict
+from client_factory import aws_client
 
 class NotificationHandler:
     def __init__(self, aws_access_key: str, aws_secret_key: str, 
                  region: str = 'ap-northeast-2'):
-        self.sqs_client = boto3.client(
-            'sqs',
-            aws_access_key_id=aws_access_key,
-            aws_secret_access_key=aws_secret_key,
-            region_name=region
-        )
-        
-        self.sns_client = boto3.client(
-            'sns',
-            aws_access_key_id=aws_access_key,
-            aws_secret_access_key=aws_secret_key,
-            region_name=region
-        )
+        self.sqs_client = aws_client('sqs', aws_access_key, aws_secret_key, region)
+        self.sns_client = aws_client('sns', aws_access_key, aws_secret_key, region)
         
     def send_to_sqs(self, queue_url: str, message: Dict):
         """SQS에 메시지 전송"""
@@ -0,0 +1,354 @@
+import io
+import json
+import math
+import tarfile
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from ncpos_2_aws_s3 import MigrationHandler, NCP_BUCKETS, encode_tagging
+
+# 묶음 대상이 되는 소형 객체 기준 크기
+DEFAULT_PACK_THRESHOLD = 64 * 1024
+# 묶음 1개의 목표 크기
+DEFAULT_BUNDLE_SIZE = 64 * 1024 * 1024
+# 대상 버킷에서 묶음 파일이 저장될 경로
+DEFAULT_PACK_PREFIX = '_packed/'
+# 묶음 그룹을 나누는 경로 깊이 (1: 최상위 prefix 단위, 0: 전체를 한 그룹)
+DEFAULT_GROUP_DEPTH = 1
+# 동시에 만드는 묶음 수
+DEFAULT_BUNDLE_WORKERS = 4
+
+PACK_FORMAT_TAR = 'tar'
+PACK_FORMAT_BLOB = 'blob'
+PACK_FORMATS = [PACK_FORMAT_TAR, PACK_FORMAT_BLOB]
+
+INDEX_SUFFIX = '.index.json'
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+TAR_BLOCK_SIZE = tarfile.BLOCKSIZE
+
+
+def pack_group(key: str, depth: int = DEFAULT_GROUP_DEPTH) -> str:
+    """객체 키의 상위 경로 중 앞쪽 depth 단계 (묶음 그룹)"""
+    return '/'.join(key.split('/')[:-1][:depth])
+
+
+def group_path(pack_prefix: str, group: str) -> str:
+    """그룹의 묶음 파일 저장 경로"""
+    return f"{pack_prefix}{group}/" if group else pack_prefix
+
+
+def merge_index(members: dict, index: dict) -> dict:
+    """인덱스 1개를 키 -> (묶음, 멤버 정보, 생성 시각) 매핑에 병합 - 같은 키는 최신 묶음 우선"""
+    for key, member in index['members'].items():
+        current = members.get(key)
+        if current is None or index['created_at'] >= current[2]:
+            members[key] = (index['bundle'], member, index['created_at'])
+    return members
+
+
+def is_packed_member(obj: dict, members: dict) -> bool:
+    """같은 ETag (묶을 당시 원본 ETag)로 이미 묶음에 들어 있는 객체인지 확인"""
+    existing = members.get(obj['Key'])
+    if existing is None:
+        return False
+    return existing[1].get('etag') == obj.get('ETag', '').strip('"')
+
+
+def packed_listing(key: str, entry) -> dict:
+    """인덱스 항목을 목록 항목 형식으로 변환 - 묶음 키/위치 포함"""
+    bundle_key, member, _ = entry
+    return {
+        'Key': key,
+        'Size': member['size'],
+        'ETag': f'"{member["etag"]}"',
+        'Bundle': bundle_key,
+        'Offset': member['offset']
+    }
+
+
+class ObjectPacker:
+    """소형 객체를 prefix 단위로 묶어 큰 객체 몇 개로 업로드 (tar 또는 blob + 인덱스)"""
+
+    def __init__(self, handler: MigrationHandler, threshold: int = DEFAULT_PACK_THRESHOLD,
+                 bundle_size: int = DEFAULT_BUNDLE_SIZE, pack_format: str = PACK_FORMAT_TAR,
+                 pack_prefix: str = DEFAULT_PACK_PREFIX, max_workers: int = 10,
+                 group_depth: int = DEFAULT_GROUP_DEPTH, bundle_workers: int = DEFAULT_BUNDLE_WORKERS):
+        if pack_format not in PACK_FORMATS:
+            raise ValueError(f"Unknown pack format: {pack_format} (choose from {PACK_FORMATS})")
+
+        self.handler = handler
+        self.logger = handler.logger
+        self.threshold = threshold
+        self.bundle_size = bundle_size
+        self.pack_format = pack_format
+        self.pack_prefix = pack_prefix
+        self.max_workers = max_workers
+        self.group_depth = group_depth
+        self.bundle_workers = bundle_workers
+        self.stats_lock = threading.Lock()
+        self.stats = {'packed_objects': 0, 'already_packed': 0, 'bundles': 0, 'packed_bytes': 0}
+        # 실행마다 다른 묶음 이름을 사용해 이전 묶음을 덮어쓰지 않음
+        self.run_id = datetime.now().strftime('%Y%m%d%H%M%S')
+        # 이미 묶음에 들어 있는 객체 확인용 (대상 버킷의 기존 인덱스)
+        self.reader = PackedObjectReader(handler.aws_client, handler.dest_bucket, pack_prefix)
+
+    def is_packed(self, obj) -> bool:
+        """같은 ETag로 이미 묶음에 들어 있는 객체인지 확인"""
+        return is_packed_member(obj, self.reader.load())
+
+    def plan_bundles(self, objects):
+        """소형 객체를 그룹별로 묶음 크기 이내로 분할"""
+        groups = {}
+        for obj in sorted(objects, key=lambda o: o['Key']):
+            groups.setdefault(pack_group(obj['Key'], self.group_depth), []).append(obj)
+
+        bundles = []
+        for group, members in groups.items():
+            current, current_size = [], 0
+            for obj in members:
+                if current and current_size + obj['Size'] > self.bundle_size:
+                    bundles.append((group, current))
+                    current, current_size = [], 0
+                current.append(obj)
+                current_size += obj['Size']
+            if current:
+                bundles.append((group, current))
+        return bundles
+
+    def fetch_object(self, obj):
+        """NCP에서 소형 객체 본문과 헤더 조회 - 실패해도 예외 대신 오류 반환 (다른 멤버에 영향 없음)"""
+        try:
+            response = self.handler.ncp_client.get_object(
+                Bucket=self.handler.source_bucket,
+                Key=obj['Key']
+            )
+            return obj, response['Body'].read(), response, None
+        except Exception as e:
+            return obj, None, None, e
+
+    def write_member(self, archive, buffer, key, data):
+        """묶음에 멤버 1개를 기록하고 본문 시작 위치 반환"""
+        if self.pack_format == PACK_FORMAT_TAR:
+            info = tarfile.TarInfo(name=key)
+            info.size = len(data)
+            info.mtime = time.time()
+            archive.addfile(info, io.BytesIO(data))
+            # 본문은 512바이트 블록 단위로 패딩되어 기록됨
+            padded = math.ceil(len(data) / TAR_BLOCK_SIZE) * TAR_BLOCK_SIZE
+            return buffer.tell() - padded
+
+        offset = buffer.tell()
+        buffer.write(data)
+        return offset
+
+    def build_bundle(self, members, bundle_key, executor):
+        """묶음 파일과 인덱스 생성 후 업로드 - 조회에 실패한 멤버는 빼고 묶은 뒤 (객체, 오류) 목록 반환"""
+        index = {
+            'bundle': bundle_key,
+            'format': self.pack_format,
+            'source_bucket': self.handler.source_bucket,
+            'created_at': datetime.now().isoformat(),
+            'members': {}
+        }
+
+        fetch_failures = []
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as buffer:
+            archive = tarfile.open(fileobj=buffer, mode='w') if self.pack_format == PACK_FORMAT_TAR else None
+
+            for obj, data, response, error in executor.map(self.fetch_object, members):
+                if error is not None:
+                    self.logger.error(f"Error fetching {obj['Key']} for {bundle_key}: {str(error)}")
+                    fetch_failures.append((obj, error))
+                    continue
+                offset = self.write_member(archive, buffer, obj['Key'], data)
+                index['members'][obj['Key']] = {
+                    'offset': offset,
+                    'size': len(data),
+                    'etag': obj.get('ETag', '').strip('"'),
+                    'content_type': response.get('ContentType'),
+                    'metadata': response.get('Metadata', {})
+                }
+
+            if not index['members']:
+                return fetch_failures
+
+            if archive is not None:
+                archive.close()
+            bundle_bytes = buffer.tell()
+            buffer.seek(0)
+
+            content_type = 'application/x-tar' if archive is not None else 'application/octet-stream'
+            extra_args = {'ContentType': content_type}
+            if self.handler.storage_class:
+                extra_args['StorageClass'] = self.handler.storage_class
+            if self.handler.tagging:
+                extra_args['Tagging'] = encode_tagging(self.handler.tagging)
+            self.handler.aws_client.upload_fileobj(
+                buffer, self.handler.dest_bucket, bundle_key, ExtraArgs=extra_args
+            )
+
+        # 인덱스는 묶음 업로드가 끝난 뒤 기록 - 인덱스가 있으면 묶음도 존재
+        index_args = {}
+        if self.handler.tagging:
+            index_args['Tagging'] = encode_tagging(self.handler.tagging)
+        self.handler.aws_client.put_object(
+            Bucket=self.handler.dest_bucket,
+            Key=f"{bundle_key}{INDEX_SUFFIX}",
+            Body=json.dumps(index, ensure_ascii=False).encode('utf-8'),
+            ContentType='application/json',
+            **index_args
+        )
+
+        packed_count = len(index['members'])
+        with self.stats_lock:
+            self.stats['bundles'] += 1
+            self.stats['packed_objects'] += packed_count
+            self.stats['packed_bytes'] += bundle_bytes
+        self.logger.info(
+            f"Packed {packed_count} objects into {bundle_key} ({self.handler.format_size(bundle_bytes)})"
+        )
+        return fetch_failures
+
+    def pack(self, objects):
+        """소형 객체 목록을 묶음으로 업로드 - 이미 묶인 (내용이 같은) 객체는 제외"""
+        pending = []
+        for obj in objects:
+            if self.is_packed(obj):
+                self.handler.record_success(obj)
+            else:
+                pending.append(obj)
+        self.stats['already_packed'] += len(objects) - len(pending)
+        objects = pending
+
+        bundles = self.plan_bundles(objects)
+        self.logger.info(f"Packing {len(objects)} small objects into {len(bundles)} bundles")
+
+        counters = {}
+        extension = 'tar' if self.pack_format == PACK_FORMAT_TAR else 'blob'
+        # 묶음 여러 개를 동시에 생성 - 멤버 GET은 별도 풀에서 실행 (중첩 대기로 인한 교착 방지)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as fetch_executor, \
+                ThreadPoolExecutor(max_workers=self.bundle_workers) as bundle_executor:
+            futures = {}
+            for group, members in bundles:
+                number = counters.get(group, 0)
+                counters[group] = number + 1
+                bundle_key = (
+                    f"{group_path(self.pack_prefix, group)}"
+                    f"bundle-{self.run_id}-{number:05d}.{extension}"
+                )
+                future = bundle_executor.submit(self.build_bundle, members, bundle_key, fetch_executor)
+                futures[future] = (members, bundle_key)
+
+            for future in as_completed(futures):
+                members, bundle_key = futures[future]
+                try:
+                    failures = future.result()
+                except Exception as e:
+                    # 묶음 업로드 실패는 개별 객체 문제가 아니므로 poison 판정 시도 횟수에 넣지 않음
+                    self.logger.error(f"Error packing {bundle_key}: {str(e)}")
+                    self.handler.stats['failed'] += len(members)
+                    for obj in members:
+                        self.handler.record_failure(obj, e, count_attempts=False)
+                    continue
+
+                # 조회에 실패한 멤버만 실패로 기록, 묶인 멤버는 이전 실패 기록 해제
+                self.handler.stats['failed'] += len(failures)
+                for obj, error in failures:
+                    self.handler.record_failure(obj, error)
+                failed_keys = {obj['Key'] for obj, _ in failures}
+                for obj in members:
+                    if obj['Key'] not in failed_keys:
+                        self.handler.record_success(obj)
+
+    def run(self, prefix: str = ""):
+        """소형 객체는 묶음으로, 나머지는 기존 방식으로 마이그레이션"""
+        objects = self.handler.list_objects(prefix)
+        # 반복 실패로 격리된 객체는 묶음/전송 모두에서 제외
+        quarantined = [obj for obj in objects if obj['Key'] in self.handler.quarantined]
+        self.handler.stats['quarantined'] += len(quarantined)
+        objects = [obj for obj in objects if obj['Key'] not in self.handler.quarantined]
+        small = [obj for obj in objects if obj['Size'] < self.threshold]
+        large = [obj for obj in objects if obj['Size'] >= self.threshold]
+
+        self.pack(small)
+        self.logger.info(
+            f"\nPacking completed:\n"
+            f"Packed objects: {self.stats['packed_objects']}\n"
+            f"Already packed (skipped): {self.stats['already_packed']}\n"
+            f"Bundles uploaded: {self.stats['bundles']}\n"
+            f"Packed size: {self.handler.format_size(self.stats['packed_bytes'])}"
+        )
+
+        if large:
+            self.handler.run_migration(prefix, objects=large)
+
+
+class PackedObjectReader:
+    """묶음 인덱스를 이용해 개별 객체를 Range GET으로 조회"""
+
+    def __init__(self, client, bucket: str, pack_prefix: str = DEFAULT_PACK_PREFIX, max_workers: int = 10):
+        self.client = client
+        self.bucket = bucket
+        self.pack_prefix = pack_prefix
+        self.max_workers = max_workers
+        self.members = None
+
+    def read_index(self, index_key: str) -> dict:
+        """인덱스 파일 1개 조회"""
+        response = self.client.get_object(Bucket=self.bucket, Key=index_key)
+        return json.loads(response['Body'].read())
+
+    def load(self) -> dict:
+        """pack_prefix 아래 인덱스 전체를 한 번의 목록 조회로 읽어 키 -> (묶음, 멤버 정보, 생성 시각) 매핑 생성 (캐시)
+
+        인덱스가 키 전체를 담고 있으므로 묶을 때의 그룹 깊이와 무관하게 조회 가능.
+        """
+        if self.members is not None:
+            return self.members
+
+        index_keys = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.pack_prefix):
+            index_keys.extend(obj['Key'] for obj in page.get('Contents', []) if obj['Key'].endswith(INDEX_SUFFIX))
+
+        members = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for index in executor.map(self.read_index, index_keys):
+                merge_index(members, index)
+
+        self.members = members
+        return members
+
+    def locate(self, key: str):
+        """객체가 들어 있는 묶음과 멤버 정보 반환"""
+        members = self.load()
+        if key not in members:
+            raise KeyError(key)
+        bundle_key, member, _ = members[key]
+        return bundle_key, member
+
+    def get_object(self, key: str) -> bytes:
+        """묶음에서 개별 객체 본문 조회"""
+        bundle_key, member = self.locate(key)
+        if member['size'] == 0:
+            return b''
+
+        end = member['offset'] + member['size'] - 1
+        response = self.client.get_object(
+            Bucket=self.bucket,
+            Key=bundle_key,
+            Range=f"bytes={member['offset']}-{end}"
+        )
+        return response['Body'].read()
+
+
+if __name__ == "__main__":
+    for bucket in NCP_BUCKETS:
+        handler = MigrationHandler(
+            source_bucket=bucket,
+            dest_bucket=bucket
+        )
+        ObjectPacker(handler).run()
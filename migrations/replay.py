@@ -0,0 +1,107 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from client_factory import ncp_s3_client, aws_client, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from dead_letter import DEFAULT_QUARANTINE_AFTER
+from ncpos_2_aws_s3 import MigrationHandler, NCP_BUCKETS
+
+
+class DeadLetterReplayer:
+    """dead-letter 파일에 기록된 객체만 재시도 - 버킷 전체 재조회 없이 실패분만 처리"""
+
+    def __init__(self, handler: MigrationHandler, max_workers: int = 8, retry_count: int = 2,
+                 backoff: float = 1.0, quarantine_after: int = DEFAULT_QUARANTINE_AFTER,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT):
+        self.handler = handler
+        self.logger = handler.logger
+        self.max_workers = max_workers
+        self.retry_count = retry_count
+        self.backoff = backoff
+        self.handler.quarantine_after = quarantine_after
+        self.stats = {'replayed': 0, 'success': 0, 'failed': 0, 'quarantined': 0}
+
+        # replay 전용 클라이언트 - 타임아웃 및 워커 수에 맞춘 커넥션 풀
+        client_options = {
+            'max_pool_connections': max(max_workers, 10),
+            'connect_timeout': connect_timeout,
+            'read_timeout': read_timeout
+        }
+        self.handler.ncp_client = ncp_s3_client(**client_options)
+        self.handler.aws_client = aws_client('s3', **client_options)
+
+    def replay_object(self, record):
+        """dead-letter 항목 1건 재시도 - 격리 기준까지 남은 시도 횟수 안에서만"""
+        obj = {'Key': record['key'], 'Size': record['size'] or 0}
+        remaining = self.handler.quarantine_after - record['attempts']
+        # 이전 실패로 대상에 불완전한 객체가 남았을 수 있으므로 덮어씀
+        succeeded = self.handler.migrate_object(
+            obj,
+            retry_count=max(min(self.retry_count, remaining), 1),
+            overwrite=True,
+            backoff=self.backoff
+        )
+        return record, obj, succeeded
+
+    def quarantine(self, record):
+        """dead-letter 항목을 오류 정보와 함께 격리"""
+        self.handler.quarantine_record(record)
+        self.stats['quarantined'] += 1
+
+    def run(self):
+        """replay 실행 후 남은 실패 항목으로 dead-letter 파일 갱신"""
+        start_time = time.time()
+        records = self.handler.dead_letter.load()
+        pending = []
+
+        for key, record in records.items():
+            if key in self.handler.quarantined:
+                continue
+            if record['attempts'] >= self.handler.quarantine_after:
+                self.quarantine(record)
+                continue
+            pending.append(record)
+
+        self.logger.info(f"Replaying {len(pending)} dead-letter objects with {self.max_workers} workers")
+
+        remaining = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.replay_object, record) for record in pending]
+            for future in as_completed(futures):
+                record, obj, succeeded = future.result()
+                self.stats['replayed'] += 1
+                if succeeded:
+                    self.stats['success'] += 1
+                    continue
+
+                self.stats['failed'] += 1
+                updated = self.handler.dead_letter.build_record(
+                    obj,
+                    obj.get('last_error'),
+                    record['attempts'] + max(obj.get('attempts', 0), 1)
+                )
+                if updated['attempts'] >= self.handler.quarantine_after:
+                    # 이번 replay에서 기준에 도달한 poison key는 즉시 격리
+                    self.quarantine(updated)
+                else:
+                    remaining.append(updated)
+
+        self.handler.dead_letter.rewrite(remaining)
+
+        self.logger.info(
+            f"\nReplay completed in {self.handler.format_time(time.time() - start_time)}\n"
+            f"Replayed: {self.stats['replayed']}\n"
+            f"Succeeded: {self.stats['success']}\n"
+            f"Still failing: {self.stats['failed']}\n"
+            f"Newly quarantined: {self.stats['quarantined']}"
+        )
+        return self.stats
+
+
+if __name__ == "__main__":
+    for bucket in NCP_BUCKETS:
+        handler = MigrationHandler(
+            source_bucket=bucket,
+            dest_bucket=bucket
+        )
+        DeadLetterReplayer(handler).run()
@@ -0,0 +1,333 @@
+import hashlib
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
+from datetime import datetime
+
+from client_factory import ncp_s3_client, aws_client, preload
+from ncpos_2_aws_s3 import MigrationHandler, NCP_BUCKETS, etags_comparable
+from packing import DEFAULT_PACK_PREFIX, PackedObjectReader, packed_listing
+
+# 검증 수준 - 뒤로 갈수록 비용 증가
+LEVEL_SAMPLED = 'sampled'   # 소스 목록 + 표본 객체만 대상 HEAD
+LEVEL_ETAG = 'etag'         # 소스/대상 목록 전체 비교
+LEVEL_FULL = 'full'         # etag + 콘텐츠 해시
+VERIFY_LEVELS = [LEVEL_SAMPLED, LEVEL_ETAG, LEVEL_FULL]
+
+# 분류 결과
+STATUS_OK = 'ok'
+STATUS_MISSING = 'missing'              # 소스에만 존재
+STATUS_EXTRA = 'extra'                  # 대상에만 존재
+STATUS_SIZE_MISMATCH = 'size_mismatch'
+STATUS_ETAG_MISMATCH = 'etag_mismatch'
+STATUS_CONTENT_MISMATCH = 'content_mismatch'
+STATUS_ERROR = 'error'
+
+# 재시도 목록에 포함할 상태
+RETRY_STATUSES = {
+    STATUS_MISSING,
+    STATUS_SIZE_MISMATCH,
+    STATUS_ETAG_MISMATCH,
+    STATUS_CONTENT_MISMATCH,
+    STATUS_ERROR
+}
+
+DEFAULT_RANGE_SIZE = 8 * 1024 * 1024
+# sampled 모드의 동시 HEAD 요청 수
+SAMPLED_HEAD_WORKERS = 10
+NOT_FOUND_CODES = {'404', 'NoSuchKey', 'NotFound'}
+
+
+def iter_objects(client, bucket, prefix=""):
+    """버킷 객체를 키 순서대로 스트리밍 (list_objects_v2는 키 정렬 순서로 반환)"""
+    paginator = client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            yield obj
+
+
+def merge_join(source_iter, dest_iter):
+    """정렬된 두 목록을 머지 조인하여 (키, 소스 객체, 대상 객체) 생성"""
+    source_obj = next(source_iter, None)
+    dest_obj = next(dest_iter, None)
+
+    while source_obj is not None or dest_obj is not None:
+        if dest_obj is None or (source_obj is not None and source_obj['Key'] < dest_obj['Key']):
+            yield source_obj['Key'], source_obj, None
+            source_obj = next(source_iter, None)
+        elif source_obj is None or dest_obj['Key'] < source_obj['Key']:
+            yield dest_obj['Key'], None, dest_obj
+            dest_obj = next(dest_iter, None)
+        else:
+            yield source_obj['Key'], source_obj, dest_obj
+            source_obj = next(source_iter, None)
+            dest_obj = next(dest_iter, None)
+
+
+def head_listing(client, bucket, key):
+    """HEAD 응답을 목록 항목 형식으로 변환 - 객체가 없으면 None"""
+    try:
+        response = client.head_object(Bucket=bucket, Key=key)
+    except Exception as e:
+        if getattr(e, 'response', {}).get('Error', {}).get('Code') in NOT_FOUND_CODES:
+            return None
+        raise
+    return {'Key': key, 'Size': response['ContentLength'], 'ETag': response['ETag']}
+
+
+def classify_listing(source_obj, dest_obj):
+    """목록(또는 HEAD) 정보만으로 분류 - 크기 및 ETag 비교 (콘텐츠 해시 제외)"""
+    if dest_obj is None:
+        return STATUS_MISSING
+    if source_obj is None:
+        return STATUS_EXTRA
+    if source_obj['Size'] != dest_obj['Size']:
+        return STATUS_SIZE_MISMATCH
+
+    source_etag = source_obj['ETag'].strip('"')
+    dest_etag = dest_obj['ETag'].strip('"')
+    # 멀티파트 ETag는 비교 불가 - 크기 일치로 판단
+    if etags_comparable(source_etag, dest_etag) and source_etag != dest_etag:
+        return STATUS_ETAG_MISMATCH
+
+    return STATUS_OK
+
+
+def split_ranges(size, range_size):
+    """객체 크기를 Range 헤더 구간 목록으로 분할"""
+    if size == 0:
+        return [None]
+    return [
+        (start, min(start + range_size, size) - 1)
+        for start in range(0, size, range_size)
+    ]
+
+
+def _read_digest(client, bucket, key, byte_range):
+    """객체(또는 구간)를 읽어 SHA-256 다이제스트 계산"""
+    request = {'Bucket': bucket, 'Key': key}
+    if byte_range is not None:
+        request['Range'] = f"bytes={byte_range[0]}-{byte_range[1]}"
+
+    digest = hashlib.sha256()
+    response = client.get_object(**request)
+    for chunk in response['Body'].iter_chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_range(source_bucket, dest_bucket, key, byte_range, dest_key=None, dest_offset=0):
+    """프로세스 풀 작업 - 소스/대상의 동일 구간 해시 비교 (묶음 멤버는 묶음 내 위치만큼 이동)"""
+    source_digest = _read_digest(ncp_s3_client(), source_bucket, key, byte_range)
+    dest_range = byte_range
+    if byte_range is not None:
+        dest_range = (byte_range[0] + dest_offset, byte_range[1] + dest_offset)
+    dest_digest = _read_digest(aws_client('s3'), dest_bucket, dest_key or key, dest_range)
+    return key, source_digest == dest_digest
+
+
+class MigrationVerifier:
+    """마이그레이션 후 소스(NCP)와 대상(AWS) 일치 여부 검증"""
+
+    def __init__(self, handler: MigrationHandler, level: str = LEVEL_ETAG,
+                 sample_rate: float = 0.01, max_workers: int = None,
+                 range_size: int = DEFAULT_RANGE_SIZE, max_in_flight: int = None,
+                 pack_prefix: str = DEFAULT_PACK_PREFIX):
+        if level not in VERIFY_LEVELS:
+            raise ValueError(f"Unknown verify level: {level} (choose from {VERIFY_LEVELS})")
+
+        self.handler = handler
+        self.logger = handler.logger
+        self.level = level
+        self.sample_rate = sample_rate
+        self.max_workers = max_workers or os.cpu_count()
+        self.range_size = range_size
+        # full 모드에서 동시에 제출해 두는 해시 작업 수 상한 (메모리 사용량 제한)
+        self.max_in_flight = max_in_flight or self.max_workers * 4
+        # pack 모드로 옮긴 객체는 대상에 개별 키가 없고 묶음 인덱스로 확인
+        self.pack_prefix = pack_prefix
+        self.reader = PackedObjectReader(handler.aws_client, handler.dest_bucket, pack_prefix)
+
+    def iter_candidates(self, prefix):
+        """검증 수준에 따라 비교 대상 (키, 소스, 대상) 생성 - 대상에 없는 키는 묶음 인덱스에서 찾음"""
+        if self.level == LEVEL_SAMPLED:
+            candidates = self.iter_sampled(prefix)
+        else:
+            # 묶음 파일/인덱스는 원본에 대응하는 키가 아니므로 대상 목록에서 제외
+            dest_objects = (
+                obj for obj in iter_objects(self.handler.aws_client, self.handler.dest_bucket, prefix)
+                if not obj['Key'].startswith(self.pack_prefix)
+            )
+            candidates = merge_join(
+                iter_objects(self.handler.ncp_client, self.handler.source_bucket, prefix),
+                dest_objects
+            )
+
+        packed = self.reader.load()
+        for key, source_obj, dest_obj in candidates:
+            if dest_obj is None and source_obj is not None and key in packed:
+                dest_obj = packed_listing(key, packed[key])
+            yield key, source_obj, dest_obj
+
+    def iter_sampled(self, prefix):
+        """sampled 모드 - 소스 목록에서 표본만 골라 대상은 HEAD로 확인 (대상 목록 조회 없음, extra 미검출)"""
+        sampled = [
+            obj for obj in iter_objects(self.handler.ncp_client, self.handler.source_bucket, prefix)
+            if random.random() < self.sample_rate
+        ]
+        with ThreadPoolExecutor(max_workers=SAMPLED_HEAD_WORKERS) as executor:
+            futures = [
+                executor.submit(head_listing, self.handler.aws_client, self.handler.dest_bucket, obj['Key'])
+                for obj in sampled
+            ]
+            for obj, future in zip(sampled, futures):
+                try:
+                    dest_obj = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error checking {obj['Key']}: {str(e)}")
+                    self.record(obj['Key'], STATUS_ERROR, obj, None)
+                    continue
+                yield obj['Key'], obj, dest_obj
+
+    def record(self, key, status, source_obj, dest_obj):
+        """분류 결과를 요약/불일치 목록에 반영"""
+        self.summary['checked'] += 1
+        self.summary[status] = self.summary.get(status, 0) + 1
+        if status != STATUS_OK:
+            self.entries.append(self.build_entry(key, status, source_obj, dest_obj))
+
+    def submit_hash(self, executor, obj, dest_obj):
+        """객체를 구간 단위로 해시 작업 제출 - 진행 중 작업 수가 상한이면 완료를 기다림"""
+        bundle_key = dest_obj.get('Bundle')
+        if bundle_key is not None and obj['Size'] == 0:
+            # 빈 묶음 멤버는 읽을 구간이 없음 - 크기 일치로 충분
+            self.record(obj['Key'], STATUS_OK, obj, dest_obj)
+            return
+
+        ranges = split_ranges(obj['Size'], self.range_size)
+        self.hash_state[obj['Key']] = {'remaining': len(ranges), 'status': STATUS_OK, 'obj': obj}
+
+        for byte_range in ranges:
+            if len(self.in_flight) >= self.max_in_flight:
+                self.drain(FIRST_COMPLETED)
+            future = executor.submit(
+                hash_range,
+                self.handler.source_bucket,
+                self.handler.dest_bucket,
+                obj['Key'],
+                byte_range,
+                bundle_key,
+                dest_obj.get('Offset', 0)
+            )
+            self.in_flight[future] = obj['Key']
+
+    def drain(self, return_when=ALL_COMPLETED):
+        """완료된 해시 작업을 반영하고 모든 구간이 끝난 객체는 결과 기록"""
+        if not self.in_flight:
+            return
+
+        done, _ = wait(self.in_flight, return_when=return_when)
+        for future in done:
+            key = self.in_flight.pop(future)
+            state = self.hash_state[key]
+            try:
+                _, matched = future.result()
+                if not matched and state['status'] == STATUS_OK:
+                    state['status'] = STATUS_CONTENT_MISMATCH
+            except Exception as e:
+                self.logger.error(f"Error hashing {key}: {str(e)}")
+                state['status'] = STATUS_ERROR
+
+            state['remaining'] -= 1
+            if state['remaining'] == 0:
+                del self.hash_state[key]
+                self.record(key, state['status'], state['obj'], state['obj'])
+
+    def run(self, prefix: str = ""):
+        """검증 실행 후 리포트 반환 - full 모드는 머지 조인과 동시에 해시 작업을 흘려보냄"""
+        self.logger.info(f"Starting {self.level} verification of {self.handler.source_bucket}...")
+        self.summary = {'checked': 0}
+        self.entries = []
+        self.in_flight = {}
+        self.hash_state = {}
+
+        executor = None
+        if self.level == LEVEL_FULL:
+            # fork 전에 서비스 모델을 로드해 워커 cold start 단축
+            preload(('s3',))
+            executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        try:
+            for key, source_obj, dest_obj in self.iter_candidates(prefix):
+                status = classify_listing(source_obj, dest_obj)
+                if executor is not None and status == STATUS_OK:
+                    self.submit_hash(executor, source_obj, dest_obj)
+                    continue
+                self.record(key, status, source_obj, dest_obj)
+
+            self.drain()
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        report = {
+            'source_bucket': self.handler.source_bucket,
+            'dest_bucket': self.handler.dest_bucket,
+            'prefix': prefix,
+            'level': self.level,
+            'verified_at': datetime.now().isoformat(),
+            'summary': self.summary,
+            'mismatches': self.entries
+        }
+
+        self.logger.info(
+            f"\nVerification Results ({self.level}):\n"
+            + "\n".join(f"{name}: {count}" for name, count in self.summary.items())
+        )
+        return report
+
+    def build_entry(self, key, status, source_obj, dest_obj):
+        """리포트 항목 생성"""
+        return {
+            'key': key,
+            'status': status,
+            'source_size': source_obj['Size'] if source_obj else None,
+            'dest_size': dest_obj['Size'] if dest_obj else None
+        }
+
+    def save_report(self, report, filename=None):
+        """검증 리포트를 JSON 파일로 저장"""
+        if filename is None:
+            os.makedirs('logs', exist_ok=True)
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            filename = f'logs/verify_{self.handler.source_bucket}_{timestamp}.json'
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        return filename
+
+
+def load_retry_list(filename):
+    """검증 리포트에서 (소스 버킷, 대상 버킷, 재마이그레이션 대상 객체 목록) 로드"""
+    with open(filename, encoding='utf-8') as f:
+        report = json.load(f)
+
+    objects = [
+        {'Key': entry['key'], 'Size': entry['source_size']}
+        for entry in report['mismatches']
+        if entry['status'] in RETRY_STATUSES and entry['source_size'] is not None
+    ]
+    return report['source_bucket'], report['dest_bucket'], objects
+
+
+if __name__ == "__main__":
+    for bucket in NCP_BUCKETS:
+        handler = MigrationHandler(
+            source_bucket=bucket,
+            dest_bucket=bucket
+        )
+        verifier = MigrationVerifier(handler)
+        report = verifier.run()
+        print(f"Verification report saved to: {verifier.save_report(report)}")
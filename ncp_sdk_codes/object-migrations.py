@@ -1,10 +1,14 @@
-import boto3
 import os
+import sys
 from datetime import datetime
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
+# 공용 클라이언트 팩토리 (migrations/client_factory.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'migrations'))
+from client_factory import get_client
+
 # NCP 설정
 ncp_endpoint = 'https://kr.object.ncloudstorage.com'
 ncp_access_key = os.environ.get('NCP_ACCESS_KEY')
@@ -21,7 +25,7 @@ class StorageMigration:
         self.setup_logging()
         
         # NCP 클라이언트 설정
-        self.ncp_client = boto3.client(
+        self.ncp_client = get_client(
             's3',
             endpoint_url=ncp_endpoint,
             aws_access_key_id=ncp_access_key,
@@ -29,7 +33,7 @@ class StorageMigration:
         )
         
         # AWS 클라이언트 설정
-        self.aws_client = boto3.client(
+        self.aws_client = get_client(
             's3',
             aws_access_key_id=aws_access_key,
             aws_secret_access_key=aws_secret_key,
@@ -41,7 +45,11 @@ class StorageMigration:
         self.aws_bucket = 'migration-s3-endpoint'  # AWS 버킷 이름 지정 필요
         
     def setup_logging(self):
-        """로깅 설정"""
+        """로깅 설정 - 프로세스당 한 번만 핸들러 구성"""
+        self.logger = logging.getLogger(__name__)
+        if logging.getLogger().handlers:
+            return
+        
         os.makedirs('logs', exist_ok=True)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
@@ -53,7 +61,6 @@ class StorageMigration:
                 logging.StreamHandler()
             ]
         )
-        self.logger = logging.getLogger(__name__)
 
     def list_objects(self, prefix=''):
         """NCP 버킷의 모든 객체 리스트 조회"""
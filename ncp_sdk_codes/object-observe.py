@@ -1,9 +1,13 @@
-import boto3
 from datetime import datetime
 import json
 import os
+import sys
 from dotenv import load_dotenv
 
+# 공용 클라이언트 팩토리 (migrations/client_factory.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'migrations'))
+from client_factory import get_client
+
 # .env 파일 로드
 load_dotenv()
 
@@ -93,8 +97,8 @@ def save_to_log(structure, filename=None):
 if __name__ == "__main__":
     try:
         # NCP Object Storage 클라이언트 생성
-        s3 = boto3.client(
-            service_name, 
+        s3 = get_client(
+            service_name,
             endpoint_url=endpoint_url, 
             aws_access_key_id=access_key,
             aws_secret_access_key=secret_key
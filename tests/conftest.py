@@ -0,0 +1,5 @@
+import os
+import sys
+
+# migrations/ 모듈은 스크립트 디렉토리 기준으로 서로를 import 함
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'migrations'))
@@ -0,0 +1,71 @@
+import hashlib
+
+
+class NotFound(Exception):
+    response = {'Error': {'Code': '404'}}
+
+
+class FakeBody:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+    def iter_chunks(self):
+        yield self.data
+
+
+class FakeS3:
+    """키 -> 내용 (또는 (내용, ETag)) 으로 동작하는 메모리 S3 클라이언트, 호출 종류 기록"""
+
+    def __init__(self, objects=None):
+        self.objects = {}
+        self.extra_args = {}
+        self.calls = []
+        self.listed_prefixes = []
+        for key, value in (objects or {}).items():
+            self.objects[key] = value if isinstance(value, tuple) else (value, None)
+
+    def listing(self, key):
+        data, etag = self.objects[key]
+        return {'Key': key, 'Size': len(data), 'ETag': etag or f'"{hashlib.md5(data).hexdigest()}"'}
+
+    def get_paginator(self, name):
+        client = self
+
+        class Paginator:
+            def paginate(self, Bucket, Prefix=''):
+                client.calls.append('list')
+                client.listed_prefixes.append(Prefix)
+                keys = sorted(key for key in client.objects if key.startswith(Prefix))
+                yield {'Contents': [client.listing(key) for key in keys]}
+
+        return Paginator()
+
+    def head_object(self, Bucket, Key):
+        self.calls.append('head')
+        if Key not in self.objects:
+            raise NotFound()
+        listing = self.listing(Key)
+        return {'ContentLength': listing['Size'], 'ETag': listing['ETag']}
+
+    def get_object(self, Bucket, Key, Range=None):
+        self.calls.append('get')
+        if Key not in self.objects:
+            raise NotFound()
+        data = self.objects[Key][0]
+        if Range:
+            start, end = map(int, Range[len('bytes='):].split('-'))
+            data = data[start:end + 1]
+        return {'Body': FakeBody(data), 'ContentType': 'text/plain', 'Metadata': {}}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.calls.append('put')
+        self.objects[Key] = (Body, None)
+        self.extra_args[Key] = kwargs
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, Config=None):
+        self.calls.append('put')
+        self.objects[key] = (fileobj.read(), None)
+        self.extra_args[key] = ExtraArgs or {}
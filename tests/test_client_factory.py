@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+import client_factory
+from client_factory import get_client, get_session
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    client_factory._reset_after_fork()
+    yield
+    client_factory._reset_after_fork()
+
+
+def s3_client(**kwargs):
+    options = {'region_name': 'ap-northeast-2', 'aws_access_key_id': 'id', 'aws_secret_access_key': 'secret'}
+    return get_client('s3', **{**options, **kwargs})
+
+
+def test_same_config_reuses_client():
+    assert s3_client() is s3_client()
+
+
+@pytest.mark.parametrize('changed', [
+    {'aws_secret_access_key': 'rotated'},
+    {'aws_access_key_id': 'other'},
+    {'max_pool_connections': 50},
+    {'connect_timeout': 5},
+    {'read_timeout': 30},
+    {'endpoint_url': 'https://kr.object.ncloudstorage.com'},
+])
+def test_different_config_gets_new_client(changed):
+    assert s3_client(**changed) is not s3_client()
+
+
+def test_secret_is_not_kept_in_cache_key():
+    s3_client(aws_secret_access_key='plain-secret')
+
+    assert all('plain-secret' not in key for key in client_factory._state['clients'])
+
+
+def test_client_config_options():
+    config = s3_client(max_pool_connections=32, connect_timeout=3, read_timeout=7).meta.config
+
+    assert (config.max_pool_connections, config.connect_timeout, config.read_timeout) == (32, 3, 7)
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="fork not available")
+def test_fork_keeps_session_and_resets_clients():
+    session = get_session()
+    parent_client = s3_client()
+    read_fd, write_fd = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        # 자식 프로세스 - 세션은 그대로, 클라이언트 캐시는 비어 있어야 함
+        ok = (
+            get_session() is session
+            and not client_factory._state['clients']
+            and s3_client() is not parent_client
+        )
+        os.write(write_fd, b'1' if ok else b'0')
+        os._exit(0)
+
+    os.close(write_fd)
+    result = os.read(read_fd, 1)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+
+    assert result == b'1'
+    assert s3_client() is parent_client
+
+
+def test_pid_change_resets_clients_without_fork_hook(monkeypatch):
+    client = s3_client()
+    monkeypatch.setitem(client_factory._state, 'pid', -1)
+
+    assert s3_client() is not client
+
+
+def test_handler_clients_use_timeouts(tmp_path, monkeypatch):
+    from ncpos_2_aws_s3 import MigrationHandler
+
+    monkeypatch.chdir(tmp_path)
+    default = MigrationHandler('source', 'dest')
+    custom = MigrationHandler('source', 'dest', connect_timeout=3, read_timeout=7)
+
+    for client in (default.ncp_client, default.aws_client):
+        assert (client.meta.config.connect_timeout, client.meta.config.read_timeout) == (
+            client_factory.DEFAULT_CONNECT_TIMEOUT, client_factory.DEFAULT_READ_TIMEOUT
+        )
+    for client in (custom.ncp_client, custom.aws_client):
+        assert (client.meta.config.connect_timeout, client.meta.config.read_timeout) == (3, 7)
@@ -0,0 +1,108 @@
+from dead_letter import DeadLetterQueue
+
+
+def test_load_merges_attempts_and_keeps_last_error(tmp_path):
+    queue = DeadLetterQueue(str(tmp_path / 'logs' / 'dead_letter.jsonl'))
+    queue.append({'Key': 'a', 'Size': 1}, ValueError('first'), attempts=3)
+    queue.append({'Key': 'b', 'Size': 2}, attempts=1)
+    queue.append({'Key': 'a', 'Size': 1}, TimeoutError('second'), attempts=2)
+
+    records = queue.load()
+
+    assert sorted(records) == ['a', 'b']
+    assert records['a']['attempts'] == 5
+    assert records['a']['error_class'] == 'TimeoutError'
+    assert records['a']['error'] == 'second'
+    assert records['b']['attempts'] == 1
+    assert records['b']['error_class'] is None
+
+
+def test_load_drops_resolved_keys(tmp_path):
+    queue = DeadLetterQueue(str(tmp_path / 'dead_letter.jsonl'))
+    queue.append({'Key': 'a', 'Size': 1}, attempts=9)
+    queue.append({'Key': 'b', 'Size': 1}, attempts=1)
+    queue.resolve('a')
+    queue.append({'Key': 'b', 'Size': 1}, attempts=1)
+
+    assert queue.keys() == {'b'}
+
+    # 해제 이후의 실패는 0부터 다시 누적
+    queue.append({'Key': 'a', 'Size': 1}, attempts=1)
+    assert queue.load()['a']['attempts'] == 1
+    assert queue.load()['b']['attempts'] == 2
+
+
+def test_rewrite_replaces_and_removes_file(tmp_path):
+    path = tmp_path / 'dead_letter.jsonl'
+    queue = DeadLetterQueue(str(path))
+    queue.append({'Key': 'a', 'Size': 1}, attempts=1)
+    queue.append({'Key': 'b', 'Size': 2}, attempts=1)
+
+    queue.rewrite([queue.load()['b']])
+    assert queue.keys() == {'b'}
+
+    queue.rewrite([])
+    assert not path.exists()
+    assert queue.load() == {}
+
+
+def test_record_failure_quarantines_with_error_info(tmp_path, monkeypatch):
+    from ncpos_2_aws_s3 import MigrationHandler
+
+    monkeypatch.chdir(tmp_path)
+    dead_letter_path = tmp_path / 'dead_letter.jsonl'
+    DeadLetterQueue(str(dead_letter_path)).append({'Key': 'a', 'Size': 1}, ValueError('old'), attempts=2)
+
+    handler = MigrationHandler(
+        'source', 'dest',
+        dead_letter_path=str(dead_letter_path),
+        quarantine_path=str(tmp_path / 'quarantine.jsonl'),
+        quarantine_after=5
+    )
+    handler.record_failure({'Key': 'b', 'Size': 2, 'attempts': 3}, TimeoutError('slow'))
+    handler.record_failure({'Key': 'a', 'Size': 1, 'attempts': 3}, TimeoutError('read timeout'))
+
+    assert handler.quarantined == {'a'}
+    record = handler.quarantine.load()['a']
+    assert record['attempts'] == 5
+    assert record['error_class'] == 'TimeoutError'
+    assert record['error'] == 'read timeout'
+    assert set(handler.dead_letter.load()) == {'a', 'b'}
+
+
+def test_record_failure_without_counting_attempts(tmp_path, monkeypatch):
+    from ncpos_2_aws_s3 import MigrationHandler
+
+    monkeypatch.chdir(tmp_path)
+    handler = MigrationHandler(
+        'source', 'dest',
+        dead_letter_path=str(tmp_path / 'dead_letter.jsonl'),
+        quarantine_path=str(tmp_path / 'quarantine.jsonl'),
+        quarantine_after=1
+    )
+    handler.record_failure({'Key': 'a', 'Size': 1}, ConnectionError('bundle upload'), count_attempts=False)
+
+    # replay 대상으로는 남지만 격리되지 않음
+    assert handler.dead_letter.load()['a']['attempts'] == 0
+    assert handler.quarantined == set()
+
+
+def test_success_resets_cumulative_attempts(tmp_path, monkeypatch):
+    from ncpos_2_aws_s3 import MigrationHandler
+
+    monkeypatch.chdir(tmp_path)
+    options = {
+        'dead_letter_path': str(tmp_path / 'dead_letter.jsonl'),
+        'quarantine_path': str(tmp_path / 'quarantine.jsonl'),
+        'quarantine_after': 5
+    }
+    handler = MigrationHandler('source', 'dest', **options)
+    handler.record_failure({'Key': 'a', 'Size': 1, 'attempts': 4}, TimeoutError('slow'))
+    handler.record_success({'Key': 'a', 'Size': 1})
+
+    # 다음 실행에서도 해제 상태 유지 - replay 대상 아님, 새 실패 1회로 격리되지 않음
+    handler = MigrationHandler('source', 'dest', **options)
+    assert handler.dead_letter.load() == {}
+    handler.record_failure({'Key': 'a', 'Size': 1, 'attempts': 1}, TimeoutError('slow'))
+    assert handler.quarantined == set()
+    assert handler.dead_letter.load()['a']['attempts'] == 1
@@ -0,0 +1,68 @@
+import pytest
+
+from dry_run_estimator import fit_linear_model, fit_saturation_model, predict_speedup
+
+
+def test_fit_linear_model_recovers_latency_and_bandwidth():
+    samples = [(size, 0.05 + size / 1_000_000) for size in (0, 1000, 10_000, 100_000)]
+    model = fit_linear_model(samples)
+
+    assert model['latency'] == pytest.approx(0.05)
+    assert model['bandwidth'] == pytest.approx(1_000_000)
+
+
+def test_fit_linear_model_without_size_variation():
+    model = fit_linear_model([(500, 0.1), (500, 0.3)])
+
+    assert model['latency'] == pytest.approx(0.2)
+    assert model['bandwidth'] is None
+
+
+def test_saturation_uses_measured_speedups():
+    # 동시 요청 8개에서 포화
+    model = fit_saturation_model({1: 1.0, 2: 2.0, 4: 4.0, 8: 8.0, 16: 8.0, 32: 7.5})
+
+    assert predict_speedup(model, 8) == pytest.approx(8.0)
+    # 워커가 늘어도 더 적은 워커 수의 측정값보다 느려지지 않음
+    assert predict_speedup(model, 32) == pytest.approx(8.0)
+    assert predict_speedup(model, 3) <= 3
+
+
+class FakeHandler:
+    source_bucket = 'source'
+    dest_bucket = 'dest'
+
+    def __init__(self, pending):
+        import logging
+        self.logger = logging.getLogger('test')
+        self.pending = pending
+
+    def plan_migration(self, prefix):
+        return {'total_objects': len(self.pending), 'packed': 0, 'pending': self.pending}
+
+    def format_size(self, size):
+        return f'{size} B'
+
+    def format_time(self, seconds):
+        return f'{seconds} s'
+
+
+@pytest.mark.parametrize('pending', [[], [{'Key': 'a', 'Size': 10}, {'Key': 'b', 'Size': 2000}]])
+def test_run_without_measurements_has_no_recommendation(pending):
+    from dry_run_estimator import MigrationEstimator
+
+    estimator = MigrationEstimator(FakeHandler(pending))
+    probed = []
+
+    def failing_probe(obj):
+        probed.append(obj['Key'])
+        raise PermissionError('AccessDenied')
+
+    estimator.probe_object = failing_probe
+    report = estimator.run()
+
+    assert report['recommendation'] is None
+    assert report['wall_clock_seconds'] == {}
+    assert report['warning']
+    # 순차 프로브가 모두 실패하면 동시성 측정은 생략
+    assert len(probed) == len(pending)
@@ -0,0 +1,259 @@
+import io
+import logging
+import tarfile
+from types import SimpleNamespace
+
+import pytest
+
+from fake_s3 import FakeS3
+from packing import (
+    ObjectPacker,
+    PACK_FORMAT_BLOB,
+    PACK_FORMAT_TAR,
+    PackedObjectReader,
+    group_path,
+    merge_index,
+    pack_group,
+)
+
+
+def make_handler(source=None, dest=None):
+    failures, successes = [], []
+    return SimpleNamespace(
+        logger=logging.getLogger(__name__),
+        ncp_client=source,
+        aws_client=dest,
+        dest_bucket='dest',
+        source_bucket='source',
+        storage_class=None,
+        tagging={},
+        stats={'failed': 0},
+        failures=failures,
+        successes=successes,
+        record_success=lambda obj: successes.append(obj['Key']),
+        record_failure=lambda obj, error=None, count_attempts=True: failures.append(
+            (obj['Key'], type(error).__name__, count_attempts)
+        ),
+        format_size=lambda size: f'{size} B'
+    )
+
+
+def make_packer(pack_format=PACK_FORMAT_TAR, bundle_size=1024, **kwargs):
+    return ObjectPacker(make_handler(), bundle_size=bundle_size, pack_format=pack_format, **kwargs)
+
+
+MEMBERS = [
+    ('a/small.txt', b'hello'),
+    ('a/' + 'long-name-' * 20 + '.txt', b'x' * 700),       # 100자 초과 - 확장 헤더
+    ('한글/파일.txt', '유니코드'.encode('utf-8')),           # 비 ASCII - PAX 헤더
+    ('a/empty.txt', b''),                                   # 빈 객체
+    ('a/block.bin', b'b' * 512),                            # 블록 크기와 정확히 일치
+]
+
+
+def test_tar_offsets_point_at_member_data():
+    packer = make_packer(PACK_FORMAT_TAR)
+    buffer = io.BytesIO()
+    archive = tarfile.open(fileobj=buffer, mode='w')
+    offsets = {key: packer.write_member(archive, buffer, key, data) for key, data in MEMBERS}
+    archive.close()
+    raw = buffer.getvalue()
+
+    for key, data in MEMBERS:
+        assert raw[offsets[key]:offsets[key] + len(data)] == data
+
+
+def test_tar_bundle_is_readable_by_tarfile():
+    packer = make_packer(PACK_FORMAT_TAR)
+    buffer = io.BytesIO()
+    archive = tarfile.open(fileobj=buffer, mode='w')
+    offsets = {key: packer.write_member(archive, buffer, key, data) for key, data in MEMBERS}
+    archive.close()
+    buffer.seek(0)
+
+    with tarfile.open(fileobj=buffer, mode='r') as reader:
+        for info in reader.getmembers():
+            assert info.offset_data == offsets[info.name]
+            assert reader.extractfile(info).read() == dict(MEMBERS)[info.name]
+
+
+def test_blob_offsets_are_contiguous():
+    packer = make_packer(PACK_FORMAT_BLOB)
+    buffer = io.BytesIO()
+    offsets = [packer.write_member(None, buffer, key, data) for key, data in MEMBERS]
+
+    expected, position = [], 0
+    for _, data in MEMBERS:
+        expected.append(position)
+        position += len(data)
+    assert offsets == expected
+    assert buffer.getvalue() == b''.join(data for _, data in MEMBERS)
+
+
+def test_plan_bundles_groups_by_prefix_and_splits_by_size():
+    packer = make_packer(bundle_size=100)
+    objects = [
+        {'Key': 'a/1', 'Size': 60},
+        {'Key': 'a/2', 'Size': 60},
+        {'Key': 'b/1', 'Size': 10},
+        {'Key': 'root', 'Size': 10},
+    ]
+    bundles = packer.plan_bundles(objects)
+
+    assert [(group, [obj['Key'] for obj in members]) for group, members in bundles] == [
+        ('a', ['a/1']),
+        ('a', ['a/2']),
+        ('b', ['b/1']),
+        ('', ['root']),
+    ]
+
+
+def test_plan_bundles_group_depth():
+    objects = [{'Key': key, 'Size': 1} for key in ('a/x/1', 'a/y/2', 'b/z/3')]
+
+    def planned(depth):
+        packer = make_packer(group_depth=depth)
+        return [(group, len(members)) for group, members in packer.plan_bundles(objects)]
+
+    assert planned(0) == [('', 3)]
+    assert planned(1) == [('a', 2), ('b', 1)]
+    assert planned(2) == [('a/x', 1), ('a/y', 1), ('b/z', 1)]
+
+
+def test_group_paths():
+    assert pack_group('a/b/c.txt') == 'a'
+    assert pack_group('a/b/c.txt', depth=2) == 'a/b'
+    assert pack_group('a/b/c.txt', depth=5) == 'a/b'
+    assert pack_group('a/b/c.txt', depth=0) == ''
+    assert pack_group('c.txt') == ''
+    assert group_path('_packed/', 'a/b') == '_packed/a/b/'
+    assert group_path('_packed/', '') == '_packed/'
+
+
+def test_merge_index_prefers_newest_bundle():
+    old = {'bundle': 'old.tar', 'created_at': '2024-01-01T00:00:00',
+           'members': {'a/1': {'offset': 0}, 'a/2': {'offset': 512}}}
+    new = {'bundle': 'new.tar', 'created_at': '2024-02-01T00:00:00',
+           'members': {'a/1': {'offset': 1024}}}
+
+    for order in ([old, new], [new, old]):
+        members = {}
+        for index in order:
+            merge_index(members, index)
+        assert members['a/1'][0] == 'new.tar'
+        assert members['a/2'][0] == 'old.tar'
+
+
+def test_unknown_pack_format_is_rejected():
+    with pytest.raises(ValueError):
+        make_packer(pack_format='zip')
+
+
+def folder_objects():
+    # create-random-folder.py 와 같은 구조 - 폴더당 파일 몇 개
+    return {
+        f'{top}/folder{folder}/file{number}.txt': f'{top}-{folder}-{number}'.encode()
+        for top in ('p', 'q') for folder in range(3) for number in range(4)
+    }
+
+
+@pytest.mark.parametrize('pack_format', [PACK_FORMAT_TAR, PACK_FORMAT_BLOB])
+def test_pack_round_trip_with_single_index_listing(pack_format):
+    source = FakeS3(folder_objects())
+    dest = FakeS3()
+    objects = [source.listing(key) for key in sorted(source.objects)]
+
+    packer = ObjectPacker(make_handler(source, dest), pack_format=pack_format)
+    packer.pack(objects)
+
+    # 최상위 prefix 단위로 묶음 2개 + 인덱스 2개, 기존 인덱스 확인은 목록 조회 1회
+    assert packer.stats['bundles'] == 2
+    assert packer.stats['packed_objects'] == len(objects)
+    assert dest.calls.count('list') == 1
+    assert dest.calls.count('put') == 4
+
+    reader = PackedObjectReader(dest, 'dest')
+    for key, data in folder_objects().items():
+        assert reader.get_object(key) == data
+
+
+def test_pack_is_idempotent():
+    source = FakeS3(folder_objects())
+    dest = FakeS3()
+    objects = [source.listing(key) for key in sorted(source.objects)]
+    ObjectPacker(make_handler(source, dest)).pack(objects)
+    puts = dest.calls.count('put')
+
+    packer = ObjectPacker(make_handler(source, dest))
+    packer.pack(objects)
+
+    assert packer.stats['already_packed'] == len(objects)
+    assert packer.stats['bundles'] == 0
+    assert dest.calls.count('put') == puts
+
+
+def test_plan_and_migration_skip_packed_objects(tmp_path, monkeypatch):
+    from ncpos_2_aws_s3 import MigrationHandler
+
+    monkeypatch.chdir(tmp_path)
+    source = FakeS3({'p/1': b'one', 'p/2': b'two', 'q/new': b'new'})
+    dest = FakeS3()
+    ObjectPacker(make_handler(source, dest)).pack([source.listing('p/1'), source.listing('p/2')])
+    # 묶은 뒤 원본이 바뀐 객체는 다시 옮겨야 함
+    source.objects['p/2'] = (b'TWO', None)
+
+    handler = MigrationHandler('source', 'dest')
+    handler.ncp_client, handler.aws_client = source, dest
+    plan = handler.plan_migration()
+
+    assert plan['packed'] == 1
+    assert [obj['Key'] for obj in plan['pending']] == ['p/2', 'q/new']
+
+    handler.run_migration()
+    assert handler.stats['total'] == 2
+    assert dest.objects['p/2'][0] == b'TWO'
+    assert 'p/1' not in dest.objects
+
+
+class FailingGet(FakeS3):
+    def __init__(self, objects, failing):
+        super().__init__(objects)
+        self.failing = failing
+
+    def get_object(self, Bucket, Key, Range=None):
+        if Key in self.failing:
+            raise TimeoutError(Key)
+        return super().get_object(Bucket, Key, Range)
+
+
+def test_member_fetch_failure_only_fails_that_member():
+    source = FailingGet(folder_objects(), failing={'p/folder1/file2.txt'})
+    dest = FakeS3()
+    objects = [source.listing(key) for key in sorted(source.objects)]
+    handler = make_handler(source, dest)
+
+    packer = ObjectPacker(handler)
+    packer.pack(objects)
+
+    assert handler.failures == [('p/folder1/file2.txt', 'TimeoutError', True)]
+    assert sorted(handler.successes) == sorted(obj['Key'] for obj in objects if obj['Key'] != 'p/folder1/file2.txt')
+    assert handler.stats['failed'] == 1
+    assert packer.stats['packed_objects'] == len(objects) - 1
+    reader = PackedObjectReader(dest, 'dest')
+    assert 'p/folder1/file2.txt' not in reader.load()
+    assert reader.get_object('p/folder1/file1.txt') == b'p-1-1'
+
+
+def test_bundle_upload_failure_does_not_count_attempts():
+    class FailingUpload(FakeS3):
+        def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, Config=None):
+            raise ConnectionError(key)
+
+    source = FakeS3({'p/1': b'one', 'p/2': b'two'})
+    handler = make_handler(source, FailingUpload())
+    ObjectPacker(handler).pack([source.listing('p/1'), source.listing('p/2')])
+
+    assert sorted(handler.failures) == [
+        ('p/1', 'ConnectionError', False),
+        ('p/2', 'ConnectionError', False),
+    ]
@@ -0,0 +1,68 @@
+import argparse
+
+import pytest
+
+from cli import parse_tags
+from ncpos_2_aws_s3 import build_upload_args, encode_tagging, guess_content_type
+
+
+def test_build_upload_args_preserves_headers_and_metadata():
+    response = {
+        'Key': 'images/a.png',
+        'ContentType': 'image/png',
+        'CacheControl': 'max-age=60',
+        'ContentDisposition': '',
+        'Metadata': {'owner': 'infra'},
+        'ContentLength': 10,
+        'ETag': '"abc"'
+    }
+
+    assert build_upload_args(response) == {
+        'ContentType': 'image/png',
+        'CacheControl': 'max-age=60',
+        'Metadata': {'owner': 'infra'}
+    }
+
+
+@pytest.mark.parametrize('content_type', [None, 'binary/octet-stream', 'application/octet-stream'])
+def test_build_upload_args_guesses_generic_content_type(content_type):
+    response = {'Key': 'docs/Report.PDF'}
+    if content_type:
+        response['ContentType'] = content_type
+
+    assert build_upload_args(response)['ContentType'] == 'application/pdf'
+
+
+def test_build_upload_args_keeps_generic_type_for_unknown_extension():
+    response = {'Key': 'data/blob', 'ContentType': 'binary/octet-stream'}
+
+    assert build_upload_args(response) == {'ContentType': 'binary/octet-stream'}
+    assert guess_content_type('.no-such-extension') is None
+
+
+def test_build_upload_args_storage_class_and_tagging():
+    extra_args = build_upload_args(
+        {'Key': 'a.txt', 'ContentType': 'text/plain'},
+        storage_class='STANDARD_IA',
+        tagging={'project': 'migration', 'owner': 'infra team'}
+    )
+
+    assert extra_args['StorageClass'] == 'STANDARD_IA'
+    assert extra_args['Tagging'] == 'project=migration&owner=infra%20team'
+
+
+def test_encode_tagging_escapes_reserved_characters():
+    assert encode_tagging({'a&b': 'c=d', '팀': '인프라'}) == 'a%26b=c%3Dd&%ED%8C%80=%EC%9D%B8%ED%94%84%EB%9D%BC'
+
+
+def test_parse_tags():
+    assert parse_tags(None) == {}
+    assert parse_tags(['project=migration', 'empty=', 'expr=a=b']) == {
+        'project': 'migration',
+        'empty': '',
+        'expr': 'a=b'
+    }
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_tags(['no-separator'])
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_tags(['=value'])
@@ -0,0 +1,192 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import verification
+from fake_s3 import FakeS3
+from packing import ObjectPacker
+from verification import (
+    LEVEL_ETAG,
+    LEVEL_FULL,
+    LEVEL_SAMPLED,
+    STATUS_CONTENT_MISMATCH,
+    STATUS_ETAG_MISMATCH,
+    STATUS_EXTRA,
+    STATUS_MISSING,
+    STATUS_OK,
+    STATUS_SIZE_MISMATCH,
+    MigrationVerifier,
+    classify_listing,
+    merge_join,
+    split_ranges,
+)
+
+
+@pytest.fixture
+def buckets(monkeypatch):
+    source = FakeS3({'a': b'same', 'b': b'src-b', 'c': b'only-in-source', 'd': b'1234'})
+    dest = FakeS3({
+        'a': b'same',
+        'b': b'dst-b',                  # 크기 같고 ETag 다름
+        'd': (b'abcd', '"multi-2"'),    # 멀티파트 ETag - 내용 해시로만 불일치 검출
+        'e': b'only-in-dest'
+    })
+    # full 모드 해시 작업을 프로세스 대신 스레드에서 가짜 클라이언트로 실행
+    monkeypatch.setattr(verification, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(verification, 'preload', lambda services: None)
+    monkeypatch.setattr(verification, 'ncp_s3_client', lambda: source)
+    monkeypatch.setattr(verification, 'aws_client', lambda service: dest)
+    handler = SimpleNamespace(
+        ncp_client=source, aws_client=dest, source_bucket='source', dest_bucket='dest',
+        logger=logging.getLogger('test')
+    )
+    return handler, source, dest
+
+
+def verify(handler, level):
+    report = MigrationVerifier(handler, level=level, sample_rate=1.0, max_workers=2).run()
+    return {entry['key']: entry['status'] for entry in report['mismatches']}
+
+
+def test_sampled_heads_sampled_keys_without_listing_destination(buckets):
+    handler, source, dest = buckets
+
+    assert verify(handler, LEVEL_SAMPLED) == {'b': STATUS_ETAG_MISMATCH, 'c': STATUS_MISSING}
+    assert source.calls == ['list']
+    # 대상은 묶음 인덱스 경로만 목록 조회하고 표본은 HEAD
+    assert dest.listed_prefixes == ['_packed/']
+    assert dest.calls.count('head') == 4
+
+
+def test_sampled_checks_only_the_sample(buckets):
+    handler, source, dest = buckets
+    report = MigrationVerifier(handler, level=LEVEL_SAMPLED, sample_rate=0.0).run()
+
+    assert report['summary'] == {'checked': 0}
+    assert 'head' not in dest.calls
+
+
+def test_etag_compares_full_listings(buckets):
+    handler, source, dest = buckets
+
+    assert verify(handler, LEVEL_ETAG) == {
+        'b': STATUS_ETAG_MISMATCH,
+        'c': STATUS_MISSING,
+        'e': STATUS_EXTRA
+    }
+    assert source.calls == ['list']
+    assert sorted(dest.listed_prefixes) == ['', '_packed/']
+    assert 'head' not in dest.calls and 'get' not in dest.calls
+
+
+def test_full_also_hashes_content(buckets):
+    handler, source, dest = buckets
+
+    assert verify(handler, LEVEL_FULL) == {
+        'b': STATUS_ETAG_MISMATCH,
+        'c': STATUS_MISSING,
+        'd': STATUS_CONTENT_MISMATCH,
+        'e': STATUS_EXTRA
+    }
+    # 목록이 일치하는 객체 (a, d) 만 양쪽에서 내용을 읽음
+    assert source.calls.count('get') == 2
+    assert dest.calls.count('get') == 2
+
+
+@pytest.fixture
+def packed_buckets(monkeypatch):
+    """p/ 아래 소형 객체는 묶음으로, q/big 은 개별 객체로 옮긴 상태"""
+    source = FakeS3({'p/1': b'one', 'p/2': b'two', 'p/empty': b'', 'q/big': b'x' * 100})
+    dest = FakeS3({'q/big': b'x' * 100})
+    monkeypatch.setattr(verification, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    monkeypatch.setattr(verification, 'preload', lambda services: None)
+    monkeypatch.setattr(verification, 'ncp_s3_client', lambda: source)
+    monkeypatch.setattr(verification, 'aws_client', lambda service: dest)
+    handler = SimpleNamespace(
+        ncp_client=source, aws_client=dest, source_bucket='source', dest_bucket='dest',
+        storage_class=None, tagging={}, stats={'failed': 0}, logger=logging.getLogger('test'),
+        record_failure=lambda obj, error=None, count_attempts=True: None, record_success=lambda obj: None,
+        format_size=str
+    )
+    small = [source.listing(key) for key in ('p/1', 'p/2', 'p/empty')]
+    ObjectPacker(handler).pack(small)
+    return handler, source, dest
+
+
+@pytest.mark.parametrize('level', [LEVEL_SAMPLED, LEVEL_ETAG, LEVEL_FULL])
+def test_packed_objects_verify_through_index(packed_buckets, level):
+    handler, source, dest = packed_buckets
+    report = MigrationVerifier(handler, level=level, sample_rate=1.0, max_workers=2).run()
+
+    # 묶인 키는 missing, 묶음 파일은 extra 로 보고되지 않음
+    assert report['mismatches'] == []
+    assert report['summary'] == {'checked': 4, STATUS_OK: 4}
+
+
+def test_changed_source_of_packed_object_is_reported(packed_buckets):
+    handler, source, dest = packed_buckets
+    source.objects['p/2'] = (b'TWO', None)
+
+    assert verify(handler, LEVEL_ETAG) == {'p/2': STATUS_ETAG_MISMATCH}
+
+
+def test_full_hashes_packed_member_inside_bundle(packed_buckets):
+    handler, source, dest = packed_buckets
+    # 인덱스는 그대로 두고 묶음 안의 p/1 내용만 손상
+    bundle_key = next(key for key in dest.objects if key.endswith('.tar'))
+    data = dest.objects[bundle_key][0]
+    dest.objects[bundle_key] = (data.replace(b'one', b'ONE'), None)
+
+    assert verify(handler, LEVEL_ETAG) == {}
+    assert verify(handler, LEVEL_FULL) == {'p/1': STATUS_CONTENT_MISMATCH}
+
+
+def objects(*keys):
+    return iter({'Key': key, 'Size': 1, 'ETag': '"e"'} for key in keys)
+
+
+def test_merge_join_emits_keys_in_order_with_both_sides():
+    joined = [
+        (key, source is not None, dest is not None)
+        for key, source, dest in merge_join(objects('a', 'b', 'd', 'e'), objects('b', 'c', 'e', 'f'))
+    ]
+
+    assert joined == [
+        ('a', True, False),
+        ('b', True, True),
+        ('c', False, True),
+        ('d', True, False),
+        ('e', True, True),
+        ('f', False, True),
+    ]
+
+
+def test_merge_join_handles_empty_sides():
+    assert [key for key, _, _ in merge_join(objects(), objects('a'))] == ['a']
+    assert [key for key, _, _ in merge_join(objects('a'), objects())] == ['a']
+    assert list(merge_join(objects(), objects())) == []
+
+
+def test_merge_join_uses_code_point_order():
+    # list_objects_v2 는 UTF-8 바이트 순서로 반환 - 코드 포인트 순서와 동일
+    keys = sorted(['a/b', 'a-b', 'a0', 'A', '가', 'z'])
+    assert [key for key, _, _ in merge_join(objects(*keys), objects(*keys))] == keys
+
+
+def test_classify_listing():
+    source = {'Key': 'k', 'Size': 10, 'ETag': '"abc"'}
+
+    assert classify_listing(source, None) == STATUS_MISSING
+    assert classify_listing(None, source) == STATUS_EXTRA
+    assert classify_listing(source, {**source, 'Size': 11}) == STATUS_SIZE_MISMATCH
+    assert classify_listing(source, {**source, 'ETag': '"def"'}) == STATUS_ETAG_MISMATCH
+    # 멀티파트 ETag 는 비교하지 않음
+    assert classify_listing(source, {**source, 'ETag': '"def-2"'}) == STATUS_OK
+
+
+def test_split_ranges():
+    assert split_ranges(0, 8) == [None]
+    assert split_ranges(8, 8) == [(0, 7)]
+    assert split_ranges(20, 8) == [(0, 7), (8, 15), (16, 19)]